@@ -0,0 +1,165 @@
+"""
+Benchmarks of the populator and of the template tags.
+
+Every benchmark reports the rows (or rendered fakes) per second, the queries
+per row and the peak memory allocated by Python (on Python 3.4+). The
+startup benchmarks time the first fake of a new process, with and without
+the warm up of the generator. They use the models of the tests, so they are
+not shipped with the package. Run them with the test settings:
+
+    $ python runbenchmarks.py
+    $ python runbenchmarks.py --rows 10000 --output bench.json populate.relations
+
+"""
+import platform
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+import django
+from django.db import connections, models
+from django.template import Context, Template
+from django.test.utils import CaptureQueriesContext
+
+from django_faker import Faker
+from django_faker.populator import Populator
+from django_faker.tests import Action, Game, Player
+
+
+class Measure(models.Model):
+
+    value= models.IntegerField()
+    small_value= models.SmallIntegerField()
+    big_value= models.BigIntegerField()
+    ratio= models.FloatField()
+    amount= models.DecimalField(max_digits=10, decimal_places=2)
+    valid= models.BooleanField()
+    checked= models.NullBooleanField()
+    day= models.DateField()
+    hour= models.TimeField()
+    measured= models.DateTimeField()
+
+    class Meta:
+        app_label = 'django_faker'
+
+
+class Article(models.Model):
+
+    title= models.CharField(max_length=200)
+    subtitle= models.CharField(max_length=200)
+    summary= models.TextField()
+    body= models.TextField()
+    description= models.TextField()
+
+    class Meta:
+        app_label = 'django_faker'
+
+
+def populatorBenchmark(entities, **options):
+    """
+    :param entities: list of (model, share of the rows, addEntity options) tuples
+    :param options: Populator.execute options
+    """
+    def benchmark(rows):
+        populator = Populator(Faker.getGenerator())
+        total = 0
+        for model, share, addOptions in entities:
+            number = max(1, int(rows * share))
+            populator.addEntity(model, number, **addOptions)
+            total += number
+        return total, lambda: populator.execute(**options)
+    return benchmark
+
+
+def templateBenchmark(source):
+    def benchmark(rows):
+        template = Template('{% load fakers %}' + source)
+        context = Context({'rows': rows})
+        return rows, lambda: template.render(context)
+    return benchmark
+
+
+def startupBenchmark(warmUp=False):
+    """
+    Time of the first fake of a new process: the caches of Faker are emptied,
+    and with `warmUp` the generator is built before the measure, as by the
+    AppConfig with settings.FAKER_WARMUP
+    """
+    def benchmark(rows):
+        Faker.generators.clear()
+        Faker.populators.clear()
+        if warmUp:
+            Faker.warmUp()
+        return 1, lambda: Faker.getGenerator().format('name')
+    return benchmark
+
+
+relations = [(Game, 0.1, {}), (Player, 0.3, {}), (Action, 0.6, {})]
+
+benchmarks = [
+    ('populate.wide.save', populatorBenchmark([(Measure, 1, {})])),
+    ('populate.wide.batch', populatorBenchmark([(Measure, 1, {})], batchSize=500)),
+    ('populate.wide.vectorize', populatorBenchmark([(Measure, 1, {'vectorize': True})], batchSize=500)),
+    ('populate.text.save', populatorBenchmark([(Article, 1, {})])),
+    ('populate.text.batch', populatorBenchmark([(Article, 1, {})], batchSize=500)),
+    ('populate.text.pools', populatorBenchmark([(Article, 1, {'poolSizes': 100})], batchSize=500)),
+    ('populate.relations.save', populatorBenchmark(relations)),
+    ('populate.relations.batch', populatorBenchmark(relations, batchSize=500)),
+    ('populate.relations.atomic', populatorBenchmark(relations, atomic=True, chunkSize=500)),
+    ('startup.cold', startupBenchmark()),
+    ('startup.warm', startupBenchmark(warmUp=True)),
+    ('template.tag', templateBenchmark("{% for i in rows|get_range %}{% fake 'name' %}{% endfor %}")),
+    ('template.filter', templateBenchmark("{% for i in rows|get_range %}{{ 'name'|fake }}{% endfor %}")),
+    ('template.or_fake', templateBenchmark("{% for i in rows|get_range %}{{ i|or_fake:'name' }}{% endfor %}")),
+]
+
+
+def measure(name, rows, func, using='default'):
+    """
+    Run a benchmark function and collect its metrics
+    """
+    if tracemalloc:
+        tracemalloc.start()
+    with CaptureQueriesContext(connections[using]) as queries:
+        start = time.time()
+        func()
+        seconds = time.time() - start
+    peakMemory = None
+    if tracemalloc:
+        peakMemory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        'name': name,
+        'rows': rows,
+        'seconds': seconds,
+        'rowsPerSecond': rows / seconds if seconds else None,
+        'queries': len(queries),
+        'queriesPerRow': float(len(queries)) / rows if rows else None,
+        'peakMemory': peakMemory,
+    }
+
+
+def run(names=None, rows=1000, using='default'):
+    """
+    Run the benchmarks whose name starts with one of `names`, or all of them.
+
+    :rtype: dict, the report of the run
+    """
+    results = []
+    for name, benchmark in benchmarks:
+        if names and not [prefix for prefix in names if name.startswith(prefix)]:
+            continue
+        number, func = benchmark(rows)
+        results.append(measure(name, number, func, using))
+
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connections[using].vendor,
+        'rows': rows,
+        'results': results,
+    }
@@ -8,11 +8,18 @@ Django-faker uses python-faker to generate test data for Django models and templ
 
 __version__ = '0.2.1'
 
+default_app_config = 'django_faker.apps.DjangoFakerConfig'
+
+from django_faker.utils import LRUCache, LazyGenerator
+
+
 class Faker(object):
 
     instance = None
-    populators = {}
-    generators = {}
+    # bounded by settings.FAKER_CACHE_SIZE
+    populators = LRUCache()
+    generators = LRUCache()
+    defaultCodename = None
 
     @classmethod
     def __new__(cls, *args, **kwargs):
@@ -43,6 +50,37 @@ class Faker(object):
 
         return codename
 
+    @staticmethod
+    def getSeed(*parts):
+        """
+        seed derived from settings.FAKER_SEED and `parts`, or None
+        """
+        from django.conf import settings
+        seed = getattr(settings, 'FAKER_SEED', None)
+        if seed is None:
+            return None
+        if not parts:
+            return seed
+        from django_faker.utils import deriveSeed
+        return deriveSeed(seed, *parts)
+
+    @classmethod
+    def getDefaultCodename(cls):
+        """
+        codename of the settings, cached until FAKER_LOCALE, FAKER_PROVIDERS
+        or LANGUAGE_CODE change
+        """
+        if cls.defaultCodename is None:
+            from django.test.signals import setting_changed
+            setting_changed.connect(cls.settingChanged, weak=False, dispatch_uid='django_faker.Faker.settingChanged')
+            cls.defaultCodename = cls.getCodename()
+        return cls.defaultCodename
+
+    @classmethod
+    def settingChanged(cls, setting=None, **kwargs):
+        if setting in ('FAKER_LOCALE', 'FAKER_PROVIDERS', 'LANGUAGE_CODE'):
+            cls.defaultCodename = None
+
 
     @classmethod
     def getGenerator(cls, locale=None, providers=None, codename=None):
@@ -50,16 +88,42 @@ class Faker(object):
         use a codename to cache generators
         """
 
-        codename = codename or cls.getCodename(locale, providers)
+        if not codename:
+            codename = cls.getCodename(locale, providers) if locale or providers else cls.getDefaultCodename()
 
-        if codename not in cls.generators:
+        # built on the first use of a formatter, or by warmUp()
+        return cls.generators.getOrCreate(codename, cls.createGenerator, locale, providers, codename)
+
+    @classmethod
+    def createGenerator(cls, locale, providers, codename):
+        """
+        LazyGenerator of a new generator, seeded from settings.FAKER_SEED
+        """
+
+        def build():
             from faker import Faker as FakerGenerator
             # initialize with faker.generator.Generator instance
             # and remember in cache
-            cls.generators[codename] = FakerGenerator( locale, providers )
-            cls.generators[codename].seed( cls.generators[codename].randomInt() )
+            generator = FakerGenerator( locale, providers )
+            seed = cls.getSeed(codename)
+            if seed is None:
+                seed = generator.randomInt()
+            generator.seed( seed )
+            return generator
+
+        return LazyGenerator(build)
+
+    @classmethod
+    def warmUp(cls, locales=None):
+        """
+        Build the generators of `locales` now instead of at their first use,
+        by default the generator of the settings. Called by the AppConfig of
+        django_faker with settings.FAKER_WARMUP.
 
-        return cls.generators[codename]
+        :param locales: optional list of locales
+        """
+        for locale in locales or [None]:
+            cls.getGenerator(locale).resolve()
 
 
 
@@ -85,17 +149,27 @@ class Faker(object):
 
         """
 
-        codename = cls.getCodename(locale, providers)
+        codename = cls.getCodename(locale, providers) if locale or providers else cls.getDefaultCodename()
 
-        if codename not in cls.populators:
+        def createPopulator():
 
-            generator = cls.generators.get(codename,  None) or cls.getGenerator(codename=codename)
+            generator = cls.getGenerator(locale, providers, codename)
 
             from django_faker import populator
 
-            cls.populators[codename] = populator.Populator( generator )
+            return populator.Populator( generator, seed=cls.getSeed(), codename=codename )
+
+        return cls.populators.getOrCreate(codename, createPopulator)
 
-        return cls.populators[codename]
+    @classmethod
+    def getCacheStats(cls):
+        """
+        hits, misses and evictions of the caches of generators and populators
+        """
+        return {
+            'generators': cls.generators.stats(),
+            'populators': cls.populators.stats(),
+        }
 
 #        if not cls.populator:
 #            cls.populator= populators.Populator(
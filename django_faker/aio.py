@@ -0,0 +1,191 @@
+"""
+Populate the database from asyncio code (Python 3.5+).
+
+The rows of each entity are generated a batch at a time in an executor
+thread and put in a bounded queue, while a writer coroutine takes them from
+the queue and inserts them with the database access of Django wrapped by
+asgiref's sync_to_async: batch N+1 is generated while batch N is written, and
+the generation waits when `queueSize` batches are waiting to be written.
+asgiref is an optional dependency, installed by the `async` extra.
+
+AutoField PKs are allocated before the generation, from nextPk(), so the
+ManyToManyField relations of a batch are generated with its rows. Entities
+are still populated one after the other, sorted by their relations.
+
+uses:
+
+    from django_faker import Faker
+    pop = Faker.getPopulator()
+    pop.addEntity(Game, 100000)
+    pop.addEntity(Player, 1000000)
+    insertedPks = await pop.executeAsync(batchSize=1000)
+
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import transaction
+
+try:
+    from asgiref.sync import sync_to_async
+except ImportError:
+    raise ImportError('Populator.executeAsync requires asgiref, install it with "pip install django-faker[async]"')
+
+from django_faker.exporters import fieldValue
+from django_faker.populator import InsertedPks, PopulationError
+from django_faker.scheduler import EntityScheduler
+
+
+class Batch(object):
+    """
+    Rows of an entity generated and waiting to be written
+    """
+
+    def __init__(self, rows, pks, firstPk, relations):
+        self.rows = rows
+        self.pks = pks
+        self.firstPk = firstPk
+        self.relations = relations
+
+
+def generateBatch(populator, entity, chunk, insertedEntities, number, firstPk):
+    """
+    Build the rows of a batch and their ManyToManyField relations, called in the executor
+
+    :param insertedEntities: the PKs of the other models, and the PKs generated
+        so far for the model of the entity
+    :rtype: Batch
+    """
+    if populator.seed is not None:
+        populator.reseed(entity, chunk)
+    rows = entity.buildRows(insertedEntities, number)
+
+    pk = entity.model._meta.pk
+    if firstPk is not None:
+        pks = list(range(firstPk, firstPk + number))
+    else:
+        # a default PK (uuid4..) must be the same in the row and the relations
+        pks = []
+        for row in rows:
+            row[pk.attname] = fieldValue(pk, row)
+            pks.append(row[pk.attname])
+
+    insertedEntities[entity.model].extend(pks)
+    relations = [(format.through, format(pks, insertedEntities))
+                 for format in entity.manyToManyFormatters.values()]
+    return Batch(rows, pks, firstPk, relations)
+
+
+def writeBatch(entity, using, batch, atomic=False):
+    """
+    Insert the rows and the relations of a batch, called by sync_to_async
+
+    :rtype: A list of the inserted PKs
+    """
+    if atomic:
+        with transaction.atomic(using=using):
+            return writeBatch(entity, using, batch)
+    pks = entity.writeRows(using, batch.rows, batch.firstPk)
+    for through, objs in batch.relations:
+        if objs:
+            through._base_manager.using(using).bulk_create(objs)
+    return pks
+
+
+async def executeEntity(populator, klass, using, insertedEntities, batchSize, atomic, queueSize, executor):
+    """
+    Generate and write the rows of an entity, overlapping the two
+    """
+    loop = asyncio.get_event_loop()
+    entity = populator.entities[klass]
+    number = populator.quantities[klass]
+    pks = insertedEntities[klass]
+
+    autoPk = entity.hasAutoPk()
+    firstPk = await sync_to_async(entity.nextPk)(using) if autoPk else None
+
+    # the generation sees only its own copy of the PKs of the model, the
+    # writer appends to the shared InsertedPks
+    generated = dict(insertedEntities)
+    generated[klass] = InsertedPks(pks, reservoirSize=pks.reservoirSize)
+
+    queue = asyncio.Queue(maxsize=queueSize)
+    errors = []
+
+    async def write():
+        while True:
+            batch = await queue.get()
+            if batch is None:
+                return
+            if errors:
+                # drain the queue, the producer stops at its next batch
+                continue
+            try:
+                pks.extend(await sync_to_async(writeBatch)(entity, using, batch, atomic))
+            except Exception as e:
+                errors.append(e)
+
+    writer = asyncio.ensure_future(write())
+    error = None
+    try:
+        for chunk, start in enumerate(range(0, number, batchSize)):
+            if errors:
+                break
+            batch = await loop.run_in_executor(
+                executor, generateBatch, populator, entity, chunk, generated, min(batchSize, number - start),
+                None if firstPk is None else firstPk + start,
+            )
+            await queue.put(batch)
+    except Exception as e:
+        # the batches already generated are still written
+        error = e
+    finally:
+        await queue.put(None)
+        await writer
+
+    if autoPk:
+        await sync_to_async(entity.resetSequence)(using)
+    if errors or error:
+        raise PopulationError(klass, len(pks), insertedEntities, errors[0] if errors else error)
+
+
+async def execute(populator, using=None, batchSize=1000, atomic=False, queueSize=2, executor=None,
+                  useCopy=True, reservoirSize=None):
+    """
+    Populate the database using all the Entity classes of the populator,
+    see Populator.executeAsync
+
+    :rtype: A dict of InsertedPks, the inserted PKs indexed by class
+    :raises PopulationError: with the PKs inserted before the failure
+    """
+    if not using:
+        using = populator.getConnection()
+
+    for entity in populator.entities.values():
+        entity.useCopy = useCopy
+        entity.profiler = populator.profiler
+        await sync_to_async(entity.prepare)(using)
+    populator.pinTime()
+
+    ownExecutor = executor is None
+    if ownExecutor:
+        executor = ThreadPoolExecutor(max_workers=1)
+
+    insertedEntities = {}
+    try:
+        for klass in EntityScheduler(populator).order():
+            if klass not in insertedEntities:
+                insertedEntities[klass] = InsertedPks(reservoirSize=reservoirSize,
+                                                      rng=populator.reservoirRandom(klass))
+            if populator.profiler:
+                with populator.profiler.profileEntity(klass, insertedEntities[klass]):
+                    await executeEntity(populator, klass, using, insertedEntities, batchSize, atomic, queueSize,
+                                        executor)
+            else:
+                await executeEntity(populator, klass, using, insertedEntities, batchSize, atomic, queueSize,
+                                    executor)
+    finally:
+        if ownExecutor:
+            executor.shutdown()
+
+    return insertedEntities
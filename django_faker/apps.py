@@ -0,0 +1,18 @@
+from django.apps import AppConfig
+
+
+class DjangoFakerConfig(AppConfig):
+    name = 'django_faker'
+    verbose_name = 'Django Faker'
+
+    def ready(self):
+        """
+        Build the generators of settings.FAKER_WARMUP before the first request:
+        True for the generator of the settings, or a list of locales
+        """
+        from django.conf import settings
+        from django_faker import Faker
+
+        warmup = getattr(settings, 'FAKER_WARMUP', False)
+        if warmup:
+            Faker.warmUp(None if warmup is True else warmup)
@@ -0,0 +1,171 @@
+"""
+Checkpoints of a long population, to resume it after a failure.
+
+After the transaction of each chunk is committed the progress of the run is
+written to a JSON file: for each model the indexes of the committed chunks,
+the number of rows and the inserted PKs (as ranges when they are
+consecutive), with the seed and the chunk size of the run. Since every chunk
+is generated from a seed derived from the seed of the run and its index (see
+Populator.reseed), a resumed run skips the committed chunks and generates
+only the missing ones.
+
+uses:
+
+    pop.execute(batchSize=1000, chunkSize=100000, checkpoint='populate.json')
+    # ... the run dies, then
+    pop.execute(batchSize=1000, chunkSize=100000, checkpoint='populate.json', resume=True)
+
+"""
+import json
+import os
+import random
+import sys
+from array import array
+
+from django_faker.populator import PkRange, modelLabel, pkTypecode
+
+
+def dumpPks(pks):
+    """
+    JSON state of an InsertedPks, PKs that are not JSON types are stored as strings
+    """
+    if pks.reservoirSize is not None:
+        return {
+            'count': pks.count,
+            'reservoir': list(pks.reservoir),
+            'indexes': list(pks.reservoirIndexes),
+        }
+    segments = []
+    for segment in pks.segments:
+        if isinstance(segment, PkRange):
+            segments.append({'range': [segment.start, segment.stop]})
+        else:
+            segments.append(list(segment))
+    return {'count': pks.count, 'segments': segments}
+
+
+def loadPks(state, pks):
+    """
+    Restore the JSON state of dumpPks in an empty InsertedPks
+    """
+    if pks.reservoirSize is not None:
+        pks.count = state['count']
+        pks.reservoir = list(state.get('reservoir', []))
+        pks.reservoirIndexes = array(pkTypecode, state.get('indexes', []))
+        return pks
+    for segment in state.get('segments', []):
+        if isinstance(segment, dict):
+            pks.extend(PkRange(*segment['range']))
+        else:
+            pks.extend(segment)
+    return pks
+
+
+class CheckpointError(Exception):
+    """
+    Raised when a checkpoint does not match the populator it resumes.
+    """
+
+
+class Checkpoint(object):
+
+    def __init__(self, path, seed=None, chunkSize=None):
+        """
+        :param path: str The path of the JSON file
+        :param seed: int The seed of the run
+        :param chunkSize: int The number of rows of the chunks of the run
+        """
+        self.path = path
+        self.seed = seed
+        self.chunkSize = chunkSize
+        self.entities = {}
+
+    @classmethod
+    def load(cls, path):
+        """
+        :rtype: Checkpoint
+        """
+        with open(path) as stream:
+            state = json.load(stream)
+        checkpoint = cls(path, state['seed'], state['chunkSize'])
+        checkpoint.entities = state['entities']
+        return checkpoint
+
+    @classmethod
+    def open(cls, path, populator, chunkSize, resume=False):
+        """
+        The checkpoint of a run of `populator`: the one saved in `path` when
+        resuming, otherwise a new one.
+
+        A new checkpoint takes the seed of the populator, or a random one that
+        is given to the populator, a checkpointed run is always seeded.
+
+        :raises CheckpointError: when the saved checkpoint was written with another chunkSize
+        """
+        if resume and os.path.exists(path):
+            checkpoint = cls.load(path)
+            if checkpoint.chunkSize != chunkSize:
+                raise CheckpointError('Checkpoint "%s" was written with chunkSize=%s, not %s' % (
+                    path, checkpoint.chunkSize, chunkSize,
+                ))
+            populator.seed = checkpoint.seed
+            return checkpoint
+
+        if populator.seed is None:
+            populator.seed = random.randint(0, sys.maxsize)
+        checkpoint = cls(path, populator.seed, chunkSize)
+        checkpoint.save()
+        return checkpoint
+
+    def state(self, klass):
+        return self.entities.setdefault(modelLabel(klass), {'chunks': [], 'rows': 0, 'pks': None})
+
+    def isDone(self, klass, chunk):
+        """
+        True when the chunk of the model was committed
+        """
+        return chunk in self.state(klass)['chunks']
+
+    def restore(self, klass, pks):
+        """
+        Restore the PKs inserted for the model in an empty InsertedPks
+
+        :rtype: InsertedPks
+        """
+        state = self.state(klass)
+        if state['pks'] is not None:
+            loadPks(state['pks'], pks)
+        return pks
+
+    def record(self, klass, chunk, pks):
+        """
+        Save the chunk of the model as committed, with all the PKs inserted for the model
+
+        :param pks: InsertedPks The PKs of the model, including the ones of the chunk
+        """
+        state = self.state(klass)
+        state['chunks'].append(chunk)
+        state['rows'] = len(pks)
+        state['pks'] = dumpPks(pks)
+        self.save()
+
+    def save(self):
+        """
+        Write the checkpoint to a temporary file and rename it over the old
+        one, so a crash while saving leaves the previous checkpoint intact
+        """
+        temp = '%s.tmp' % self.path
+        with open(temp, 'w') as stream:
+            json.dump({
+                'seed': self.seed,
+                'chunkSize': self.chunkSize,
+                'entities': self.entities,
+            }, stream, default=str)
+            stream.flush()
+            os.fsync(stream.fileno())
+        if hasattr(os, 'replace'):
+            os.replace(temp, self.path)
+        else:
+            if os.name == 'nt' and os.path.exists(self.path):
+                os.remove(self.path)
+            os.rename(temp, self.path)
@@ -0,0 +1,240 @@
+"""
+Stream the rows of a Populator to a file-like object instead of the database.
+
+The rows are generated by the same field formatters of Populator.execute,
+a chunk at a time, and written as CSV, JSON Lines or in the text format of
+the PostgreSQL COPY command. AutoField PKs are synthetic, they are assigned
+in sequence from `firstPk`, so the relations between the exported entities
+are consistent.
+
+uses:
+
+    pop = Faker.getPopulator()
+    pop.addEntity(Game, 1000)
+    pop.addEntity(Player, 100000)
+
+    with open('seed.sql', 'w') as stream:
+        pop.export(stream, 'copy')
+
+    # one file for each model
+    pop.export({Game: open('game.csv', 'w'), Player: open('player.csv', 'w')}, 'csv')
+
+"""
+import binascii
+import csv
+import io
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Model
+from django.utils import six
+from django.utils.encoding import force_bytes, force_text
+
+from django_faker.populator import InsertedPks
+from django_faker.scheduler import EntityScheduler
+
+try:
+    xrange
+except NameError:
+    xrange = range
+
+
+def fieldValue(field, row):
+    """
+    Value of a field in a row built by ModelPopulator.buildRows
+    """
+    if field.attname in row:
+        return row[field.attname]
+    if field.name not in row:
+        return field.get_default()
+    value = row[field.name]
+    if isinstance(value, Model):
+        return value.pk
+    return value
+
+
+class TextStream(object):
+    """
+    Write text to a stream, encoded as UTF-8 when it is a byte stream of
+    Python 2 (e.g. a file from open(path, 'w'))
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.binary = six.PY2 and not isinstance(stream, io.TextIOBase)
+
+    def write(self, data):
+        self.stream.write(force_bytes(data) if self.binary else force_text(data))
+
+
+def copyValue(value):
+    """
+    Text of a value in the PostgreSQL COPY format
+    """
+    if value is None:
+        return '\\N'
+    if value is True:
+        return 't'
+    if value is False:
+        return 'f'
+    return (force_text(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def copyField(field, value):
+    """
+    Value of a field for copyValue, binary data in the hex format of bytea
+    """
+    if value is not None and field.get_internal_type() == 'BinaryField':
+        return '\\x' + binascii.hexlify(bytes(value)).decode('ascii')
+    return value
+
+
+def copyLine(values):
+    return '\t'.join([copyValue(value) for value in values]) + '\n'
+
+
+class CsvWriter(object):
+    """
+    Rows as CSV, every model starts with a header of its column names
+    """
+
+    def __init__(self, stream):
+        # the csv module of Python 2 writes byte strings only
+        self.writer = csv.writer(TextStream(stream))
+        self.cell = force_bytes if six.PY2 else force_text
+
+    def begin(self, model, fields):
+        self.writer.writerow([self.cell(field.column) for field in fields])
+
+    def write(self, model, fields, rows):
+        writerow = self.writer.writerow
+        cell = self.cell
+        for row in rows:
+            writerow(['' if value is None else cell(value)
+                      for value in [fieldValue(field, row) for field in fields]])
+
+    def end(self, model):
+        pass
+
+
+class JsonLinesWriter(object):
+    """
+    Rows as JSON Lines, in the format of the Django serializers
+    """
+
+    def __init__(self, stream):
+        self.stream = TextStream(stream)
+
+    def begin(self, model, fields):
+        pass
+
+    def write(self, model, fields, rows):
+        label = '%s.%s' % (model._meta.app_label, model._meta.object_name.lower())
+        pk = model._meta.pk
+        for row in rows:
+            self.stream.write(json.dumps({
+                'model': label,
+                'pk': fieldValue(pk, row),
+                'fields': dict([(field.name, fieldValue(field, row)) for field in fields if field is not pk]),
+            }, cls=DjangoJSONEncoder) + '\n')
+
+    def end(self, model):
+        pass
+
+
+class CopyWriter(object):
+    """
+    Rows as COPY ... FROM stdin statements, the output can be loaded with psql
+    """
+
+    def __init__(self, stream):
+        self.stream = TextStream(stream)
+
+    def begin(self, model, fields):
+        self.stream.write('COPY "%s" (%s) FROM stdin;\n' % (
+            model._meta.db_table, ', '.join(['"%s"' % field.column for field in fields]),
+        ))
+
+    def write(self, model, fields, rows):
+        write = self.stream.write
+        for row in rows:
+            write(copyLine([copyField(field, fieldValue(field, row)) for field in fields]))
+
+    def end(self, model):
+        self.stream.write('\\.\n')
+
+
+writers = {
+    'csv': CsvWriter,
+    'jsonl': JsonLinesWriter,
+    'copy': CopyWriter,
+}
+
+
+def iterChunks(populator, chunkSize=1000, firstPk=1, insertedEntities=None):
+    """
+    Generate the rows of all the entities of a populator, a chunk at a time,
+    each model after the models it relates to (see django_faker.scheduler).
+
+    :param insertedEntities: optional dict filled with the PKs of the generated rows
+    :rtype: iterator of (model, list of rows) tuples
+    """
+    for entity in populator.entities.values():
+        entity.prepare(None)
+    populator.pinTime()
+
+    if insertedEntities is None:
+        insertedEntities = {}
+    for klass in EntityScheduler(populator).order():
+        entity = populator.entities[klass]
+        number = populator.quantities[klass]
+        pk = klass._meta.pk
+        autoPk = entity.hasAutoPk()
+        pks = insertedEntities[klass] = InsertedPks()
+
+        for start in xrange(0, number, chunkSize):
+            if populator.seed is not None:
+                populator.reseed(entity, start // chunkSize)
+            rows = entity.buildRows(insertedEntities, min(chunkSize, number - start))
+            if autoPk:
+                for i, row in enumerate(rows):
+                    row[pk.attname] = firstPk + start + i
+                pks.extend(xrange(firstPk + start, firstPk + start + len(rows)))
+            else:
+                pks.extend([fieldValue(pk, row) for row in rows])
+            yield klass, rows
+
+
+def export(populator, stream, format='csv', chunkSize=1000, firstPk=1):
+    """
+    Write the rows of all the entities of a populator.
+
+    :param stream: file-like object, or dict with model as key and file-like object as value
+    :param format: one of 'csv', 'jsonl' or 'copy'
+    :param chunkSize: int The number of rows generated at a time
+    :param firstPk: int The first synthetic PK of each model
+    :rtype: dict with model as key and the InsertedPks of its exported rows as value
+    """
+    writerClass = writers[format]
+    streamWriters = {}
+    insertedEntities = {}
+    current = writer = fields = None
+
+    for klass, rows in iterChunks(populator, chunkSize, firstPk, insertedEntities):
+        if klass is not current:
+            if current is not None:
+                writer.end(current)
+            target = stream[klass] if isinstance(stream, dict) else stream
+            writer = streamWriters.get(id(target))
+            if writer is None:
+                writer = streamWriters[id(target)] = writerClass(target)
+            fields = klass._meta.fields
+            writer.begin(klass, fields)
+            current = klass
+        writer.write(klass, fields, rows)
+
+    if current is not None:
+        writer.end(current)
+
+    return insertedEntities
@@ -1,33 +1,95 @@
+import datetime
 import re
 
+from django_faker.utils import referenceTime
+
+# field names are lowercased before the match
+isPattern = re.compile(r'^is[_A-Z]')
+atPattern = re.compile(r'(_a|A)t$')
+
+
+def dateTimeFormatter(generator):
+    """
+    Random datetimes between the epoch and the reference time of the
+    generator, see django_faker.utils.referenceTime
+    """
+    return lambda x: datetime.datetime.fromtimestamp(generator.randomInt(0, referenceTime(generator)))
+
+
 class Name(object):
+    """
+    Guess the formatter of a field from its name.
+
+    `patterns` are tried first, then the lowercased name is looked up in
+    `formatters`, both map to the name of a formatter of the generator.
+    """
+
+    patterns = [
+        (isPattern, 'boolean'),
+        (atPattern, 'dateTime'),
+    ]
+
+    formatters = {
+        'first_name': 'firstName', 'firstname': 'firstName',
+        'last_name': 'lastName', 'lastname': 'lastName',
+
+        'username': 'userName', 'login': 'userName', 'nickname': 'userName',
+        'email': 'email', 'email_address': 'email',
+        'phone_number': 'phoneNumber', 'phonenumber': 'phoneNumber', 'phone': 'phoneNumber',
+        'address': 'address',
+        'city': 'city',
+        'streetaddress': 'streetAddress',
+        'postcode': 'postcode', 'zipcode': 'postcode',
+        'state': 'state',
+        'country': 'country',
+        'title': 'sentence',
+        'body': 'text', 'summary': 'text', 'description': 'text',
+    }
+
+    # formatters built here instead of looked up on the generator, their
+    # dates end at the time pinned by the seeded runs
+    localFormatters = {
+        'dateTime': dateTimeFormatter,
+    }
+
+    # incremented by register(), invalidates the cached guesses
+    version = 0
+
     def __init__(self, generator):
         """
         :param generator Generator
         """
         self.generator = generator
 
+    @classmethod
+    def register(cls, name, formatter):
+        """
+        Use a formatter of the generator for the fields named `name`
+
+            Name.register('nickname', 'firstName')
+
+        :param name: str The field name, matched lowercased
+        :param formatter: str The name of the formatter of the generator
+        """
+        cls.formatters[name.lower()] = formatter
+        Name.version += 1
+
     def guessFormat(self, name):
         """
         :param name:
         :type name: str
         """
         name = name.lower()
+        for pattern, formatter in self.patterns:
+            if pattern.search(name):
+                return self.format(formatter)
+
+        formatter = self.formatters.get(name)
+        if formatter:
+            return self.format(formatter)
+
+    def format(self, formatter):
         generator = self.generator
-        if re.findall(r'^is[_A-Z]', name): return lambda x:generator.boolean()
-        if re.findall(r'(_a|A)t$', name): return lambda x:generator.dateTime()
-
-        if name in ('first_name','firstname'): return lambda x: generator.firstName()
-        if name in ('last_name','lastname'): return lambda x: generator.lastName()
-
-        if name in ('username','login','nickname'): return lambda x:generator.userName()
-        if name in ('email','email_address'): return lambda x:generator.email()
-        if name in ('phone_number','phonenumber','phone'): return lambda x:generator.phoneNumber()
-        if name == 'address' : return lambda x:generator.address()
-        if name == 'city' : return lambda x: generator.city()
-        if name == 'streetaddress' : return lambda x: generator.streetaddress()
-        if name in ('postcode','zipcode'): return lambda x: generator.postcode()
-        if name == 'state' : return lambda x: generator.state()
-        if name == 'country' : return lambda x: generator.country()
-        if name == 'title' : return lambda x: generator.sentence()
-        if name in ('body','summary', 'description'): return lambda x: generator.text()
\ No newline at end of file
+        if formatter in self.localFormatters:
+            return self.localFormatters[formatter](generator)
+        return lambda x: getattr(generator, formatter)()
@@ -0,0 +1,84 @@
+"""
+Load the rows of a Populator with the PostgreSQL COPY command.
+
+Used by ModelPopulator.writeRows when the database is PostgreSQL, the
+rows of a batch are serialized in memory in the COPY text format and sent
+through the copy API of the psycopg cursor. AutoField PKs are allocated
+from the sequence of the table before the rows are sent.
+"""
+import io
+
+from django.db import connections
+
+from django_faker.exporters import copyField, copyLine, fieldValue
+
+
+def supportsCopy(using):
+    return connections[using].vendor == 'postgresql'
+
+
+def dbValue(field, row, connection):
+    """
+    Value of a field in a row as sent by COPY
+    """
+    value = fieldValue(field, row)
+    if field.get_internal_type() == 'BinaryField':
+        # the Binary wrapper of the driver has no text form
+        return copyField(field, value)
+    return field.get_db_prep_save(value, connection=connection)
+
+
+def allocatePks(connection, model, number):
+    """
+    Take `number` values from the PK sequence of a model
+    """
+    pk = model._meta.pk
+    cursor = connection.cursor()
+    cursor.execute('SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)', [
+        connection.ops.quote_name(model._meta.db_table), pk.column, number,
+    ])
+    return [row[0] for row in cursor.fetchall()]
+
+
+def copyRows(entity, using, rows, firstPk=None):
+    """
+    Write rows built by a ModelPopulator with COPY FROM STDIN.
+
+    :rtype: A list of the inserted PKs
+    """
+    model = entity.model
+    connection = connections[using]
+    pk = model._meta.pk
+    number = len(rows)
+
+    if entity.hasAutoPk():
+        if firstPk is None:
+            pks = allocatePks(connection, model, number)
+        else:
+            pks = list(range(firstPk, firstPk + number))
+        for row, value in zip(rows, pks):
+            row[pk.attname] = value
+    else:
+        pks = [fieldValue(pk, row) for row in rows]
+
+    fields = model._meta.local_fields
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(copyLine([dbValue(field, row, connection) for field in fields]))
+    buffer.seek(0)
+
+    qn = connection.ops.quote_name
+    sql = 'COPY %s (%s) FROM STDIN' % (
+        qn(model._meta.db_table), ', '.join([qn(field.column) for field in fields]),
+    )
+    cursor = connection.cursor()
+    raw = cursor.cursor
+    if hasattr(raw, 'copy_expert'):
+        # psycopg2
+        raw.copy_expert(sql, buffer)
+    else:
+        # psycopg 3
+        with raw.copy(sql) as copy:
+            copy.write(buffer.getvalue())
+
+    return pks
@@ -0,0 +1,125 @@
+"""
+Populate models with fake rows.
+
+    $ python manage.py populate myapp.Game=1000 myapp.Player=100000 --batch-size 1000 --workers 4
+
+"""
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from django_faker import Faker
+from django_faker.populator import Populator, PopulationError, modelLabel
+from django_faker.profiling import timer
+
+
+def getModel(label):
+    from django.apps import apps
+    try:
+        return apps.get_model(label)
+    except (LookupError, ValueError):
+        return None
+
+
+class Progress(object):
+    """
+    Write the rows per second and the ETA of each model while it is populated,
+    at most every `interval` seconds, and its totals when it is done.
+    """
+
+    def __init__(self, stdout, interval=1.0):
+        self.stdout = stdout
+        self.interval = interval
+        self.started = {}
+        self.written = {}
+        self.totals = []
+
+    def __call__(self, model, done, total):
+        now = timer()
+        if done == 0 or model not in self.started:
+            self.started[model] = now
+            self.written[model] = now
+        elapsed = now - self.started[model]
+        rate = done / elapsed if elapsed else 0.0
+
+        if done >= total:
+            self.totals.append((model, done, elapsed))
+            self.stdout.write('%s: %d rows in %.1fs (%d rows/s)' % (modelLabel(model), done, elapsed, rate))
+            return
+        if now - self.written[model] < self.interval:
+            return
+        self.written[model] = now
+        eta = datetime.timedelta(seconds=int((total - done) / rate)) if rate else '?'
+        self.stdout.write('%s: %d/%d rows, %d rows/s, ETA %s' % (modelLabel(model), done, total, rate, eta))
+
+    def summary(self, elapsed):
+        rows = sum([done for model, done, time in self.totals])
+        return 'Populated %d rows of %d models in %.1fs (%d rows/s)' % (
+            rows, len(self.totals), elapsed, rows / elapsed if elapsed else 0,
+        )
+
+
+class Command(BaseCommand):
+    help = 'Populate models with fake rows, e.g. populate myapp.Game=1000 myapp.Player=100000'
+
+    def add_arguments(self, parser):
+        parser.add_argument('counts', nargs='+', metavar='app_label.Model=N',
+                            help='A model and its number of rows')
+        parser.add_argument('--batch-size', type=int, default=1000, dest='batchSize',
+                            help='Rows written by each bulk insert (default 1000), 0 to save one row at a time')
+        parser.add_argument('--chunk-size', type=int, default=None, dest='chunkSize',
+                            help='Rows of each transaction and checkpoint (default the batch size)')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Worker processes of each model')
+        parser.add_argument('--threads', type=int, default=None,
+                            help='Models without relations between them populated at the same time')
+        parser.add_argument('--seed', type=int, default=None,
+                            help='Seed of the rows (default settings.FAKER_SEED)')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='Database alias (default "%s")' % DEFAULT_DB_ALIAS)
+        parser.add_argument('--locale', default=None,
+                            help='Locale of the generator (default settings.FAKER_LOCALE)')
+        parser.add_argument('--checkpoint', default=None,
+                            help='JSON file saving the progress after each chunk')
+        parser.add_argument('--resume', action='store_true', default=False,
+                            help='Skip the chunks saved in the checkpoint by a previous run')
+
+    def handle(self, *args, **options):
+        counts = []
+        for arg in options['counts']:
+            label, sep, number = arg.partition('=')
+            model = getModel(label)
+            if model is None:
+                raise CommandError('Unknown model "%s"' % label)
+            try:
+                counts.append((model, int(number)))
+            except ValueError:
+                raise CommandError('Invalid number of rows in "%s", use app_label.Model=N' % arg)
+
+        if options['threads'] and options['threads'] > 1 and options['workers'] and options['workers'] > 1:
+            raise CommandError('--threads and --workers cannot be used together')
+
+        locale = options['locale']
+        codename = Faker.getCodename(locale) if locale else Faker.getDefaultCodename()
+        seed = options['seed'] if options['seed'] is not None else Faker.getSeed()
+        populator = Populator(Faker.getGenerator(locale, codename=codename), seed=seed, codename=codename)
+        for model, number in counts:
+            populator.addEntity(model, number)
+
+        progress = Progress(self.stdout)
+        start = timer()
+        try:
+            populator.execute(
+                using=options['database'],
+                batchSize=options['batchSize'] or None,
+                chunkSize=options['chunkSize'],
+                processes=options['workers'],
+                threads=options['threads'],
+                checkpoint=options['checkpoint'],
+                resume=options['resume'],
+                progress=progress,
+            )
+        except (PopulationError, ValueError) as e:
+            raise CommandError(e)
+        self.stdout.write(progress.summary(timer() - start))
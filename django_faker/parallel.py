@@ -0,0 +1,208 @@
+"""
+Populate the database with a pool of worker processes.
+
+Each entity of a Populator is split in tasks that are executed by forked
+workers, every worker opens its own database connection and reseeds its
+generator for the chunk of the task (see Populator.reseed), so with the
+seed of the populator and the same chunkSize the rows are the same of a
+serial run. Entities are still populated one after the other, sorted by
+their relations (see django_faker.scheduler), so the related PKs exist
+before the dependent rows.
+
+The values already used by the unique fields are loaded once, before the
+workers are forked, and every worker generates only the unique values of its
+own partition (see ModelPopulator.partitionUnique), so two workers never
+write the same value. The unique values of a seeded run depend on the worker
+of each chunk.
+
+uses:
+
+    from django_faker import Faker
+    pop = Faker.getPopulator()
+    pop.addEntity(Game, 100000)
+    pop.addEntity(Player, 1000000)
+    pop.execute(batchSize=1000, processes=8)
+
+"""
+import multiprocessing
+import random
+import sys
+
+from django.db import connections, transaction
+
+from django_faker.populator import InsertedPks, PopulationError
+from django_faker.scheduler import EntityScheduler
+
+# the Populator in use, inherited by the forked workers
+_populator = None
+
+
+def _executeTask(task):
+    """
+    Insert the rows of a task in the current process.
+
+    :rtype: tuple with the InsertedPks of the task and an error message or None
+    """
+    klass, chunk, number, firstPk, seed, insertedEntities, using, batchSize, atomic = task
+
+    populator = _populator
+    entity = populator.entities[klass]
+    populator.reseed(entity, chunk, seed)
+
+    insertedEntities = dict(insertedEntities)
+    pks = insertedEntities[klass] = InsertedPks()
+    try:
+        if atomic:
+            with transaction.atomic(using=using):
+                populator.executeChunk(entity, using, insertedEntities, number, batchSize, firstPk)
+        else:
+            populator.executeChunk(entity, using, insertedEntities, number, batchSize, firstPk)
+    except Exception as e:
+        if atomic:
+            del pks[0:]
+        return pks, '%s' % e
+    return pks, None
+
+
+def _forkContext(klass):
+    """
+    The fork start method of multiprocessing, the workers inherit the
+    populator of the parent and can not be spawned from a pickled copy.
+
+    :raises PopulationError: where fork is not available (e.g. Windows)
+    """
+    getContext = getattr(multiprocessing, 'get_context', None)
+    if getContext is None:
+        # Python 2 always forks on POSIX
+        if sys.platform == 'win32':
+            raise PopulationError(klass, 0, {}, 'worker processes require the fork start method')
+        return multiprocessing
+    try:
+        return getContext('fork')
+    except ValueError:
+        raise PopulationError(klass, 0, {}, 'worker processes require the fork start method')
+
+
+def _initWorker(counter, processes):
+    """
+    Give the worker its partition of the unique values
+    """
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    for entity in _populator.entities.values():
+        entity.partitionUnique(index, processes)
+
+
+class ParallelExecutor(object):
+
+    def __init__(self, populator, processes=None):
+        """
+        :param populator: Populator
+        :param processes: number of worker processes, defaults to the number of CPUs
+        :type processes: integer or None
+        """
+        self.populator = populator
+        self.processes = processes or multiprocessing.cpu_count()
+
+    def split(self, number, chunkSize=None):
+        """
+        Split `number` rows in (start, count) tasks, one per chunk or one per process
+        """
+        size = chunkSize or (number + self.processes - 1) // self.processes or 1
+        return [(start, min(size, number - start)) for start in range(0, number, size)]
+
+    def execute(self, using=None, batchSize=None, atomic=False, chunkSize=None, seed=None, useCopy=True,
+                reservoirSize=None, checkpoint=None, resume=False, progress=None):
+        """
+        Populate the database using all the Entity classes of the populator.
+
+        Arguments are the same of Populator.execute, `seed` is the base of the
+        seeds of the workers, by default the seed of the populator.
+
+        :rtype: A list of the inserted PKs
+        :raises PopulationError: with the PKs inserted before the failure, or
+            when the platform can not fork the workers
+        """
+        global _populator
+
+        populator = self.populator
+        order = EntityScheduler(populator).order()
+        context = _forkContext(order[0]) if self.processes > 1 and order else None
+        if not using:
+            using = populator.getConnection()
+        if checkpoint:
+            from django_faker.checkpoint import Checkpoint
+            if not chunkSize:
+                # the default chunks depend on the number of processes
+                raise ValueError('A checkpointed parallel population requires a chunkSize')
+            if seed is not None:
+                populator.seed = seed
+            checkpoint = Checkpoint.open(checkpoint, populator, chunkSize, resume)
+            seed = populator.seed
+            atomic = True
+        if seed is None:
+            seed = populator.seed
+        if seed is None:
+            seed = random.randint(0, sys.maxsize)
+        for entity in populator.entities.values():
+            entity.useCopy = useCopy
+            # inherited by the workers, the used unique values are loaded once
+            entity.prepare(using)
+
+        _populator = populator
+        pool = None
+        if context:
+            # the workers must not share the connections of the parent
+            for connection in connections.all():
+                connection.close()
+            pool = context.Pool(self.processes, _initWorker, (context.Value('i', 0), self.processes))
+        mapper = pool.imap if pool else lambda func, tasks: (func(task) for task in tasks)
+
+        try:
+            insertedEntities = {}
+            for klass in order:
+                entity = populator.entities[klass]
+                number = populator.quantities[klass]
+                pks = insertedEntities.setdefault(klass, InsertedPks(reservoirSize=reservoirSize,
+                                                                     rng=populator.reservoirRandom(klass)))
+                if checkpoint:
+                    checkpoint.restore(klass, pks)
+
+                # workers take their PKs from disjoint ranges
+                firstPk = entity.nextPk(using) if batchSize and entity.hasAutoPk() else None
+
+                tasks = []
+                done = 0
+                for chunk, (start, count) in enumerate(self.split(number, chunkSize)):
+                    if checkpoint and checkpoint.isDone(klass, chunk):
+                        done += count
+                        continue
+                    tasks.append((
+                        klass, chunk, count, None if firstPk is None else firstPk + start,
+                        seed, insertedEntities, using, batchSize, atomic,
+                    ))
+
+                if progress:
+                    progress(klass, done, number)
+                error = None
+                for task, (taskPks, taskError) in zip(tasks, mapper(_executeTask, tasks)):
+                    pks.extend(taskPks)
+                    error = error or taskError
+                    if checkpoint and not taskError:
+                        checkpoint.record(klass, task[1], pks)
+                    done += task[2]
+                    if progress:
+                        progress(klass, done, number)
+
+                if firstPk is not None:
+                    entity.resetSequence(using)
+                if error:
+                    raise PopulationError(klass, len(pks), insertedEntities, error)
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+            _populator = None
+
+        return insertedEntities
@@ -1,10 +1,196 @@
+import datetime
 import random
-from django_faker.guessers import Name
-from django.db.models.fields import *
-from django.db.models import ForeignKey, ManyToManyField, OneToOneField, ImageField
+from array import array
+from bisect import bisect_right
+from decimal import Decimal
+from itertools import chain
+from django_faker.guessers import Name, dateTimeFormatter
+from django_faker.utils import LRUCache, UniqueSet, deriveSeed, pinTime, referenceTime
+from django.core.management.color import no_style
+from django.db import connections, router, transaction
+from django.db.models.fields import (
+    AutoField, BigIntegerField, BooleanField, CharField, DateField, DateTimeField, DecimalField, EmailField,
+    FloatField, IntegerField, IPAddressField, NullBooleanField, SlugField, SmallIntegerField, TextField,
+    TimeField, URLField,
+)
+from django.db.models import ForeignKey, OneToOneField, ImageField, Max
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    xrange
+except NameError:
+    xrange = range
+
+try:
+    integer_types = (int, long)
+except NameError:
+    integer_types = (int,)
+
+try:
+    string_types = basestring
+except NameError:
+    string_types = str
+
+# typecode of the arrays of integer PKs, there is no 'q' on Python 2 where
+# 'l' is 64 bit on most platforms
+try:
+    pkTypecode = 'q'
+    array(pkTypecode)
+except ValueError:
+    pkTypecode = 'l'
+
+
+def bitsColumn(bits):
+    """
+    Column of random integers in [0, 2**bits)
+    """
+    if numpy:
+        def column(rng, number):
+            state = numpy.random.RandomState(rng.getrandbits(32))
+            return state.randint(0, 2 ** bits, size=number, dtype='uint64').tolist()
+        return column
+
+    def column(rng, number):
+        getrandbits = rng.getrandbits
+        return [getrandbits(bits) for i in range(0, number)]
+    return column
+
+
+def booleanColumn(rng, number):
+    if not number:
+        return []
+    bits = rng.getrandbits(number)
+    return [bool(bits >> i & 1) for i in range(0, number)]
+
+
+def nullBooleanColumn(rng, number):
+    values = (None, True, False)
+    return [values[rng.randrange(3)] for i in range(0, number)]
+
+
+def floatColumn(rng, number):
+    if numpy:
+        state = numpy.random.RandomState(rng.getrandbits(32))
+        return state.uniform(-1e6, 1e6, number).tolist()
+    uniform = rng.uniform
+    return [uniform(-1e6, 1e6) for i in range(0, number)]
+
+
+def decimalColumn(field):
+    limit = 10 ** field.max_digits
+    places = -field.decimal_places
+
+    def column(rng, number):
+        randrange = rng.randrange
+        return [Decimal(randrange(1 - limit, limit)).scaleb(places) for i in range(0, number)]
+    return column
+
+
+def timestampColumn(convert):
+    """
+    Column of values converted from random timestamps between the epoch and
+    the reference time of the random state, see django_faker.utils.referenceTime
+    """
+    def column(rng, number):
+        now = referenceTime(rng)
+        if numpy:
+            state = numpy.random.RandomState(rng.getrandbits(32))
+            timestamps = state.randint(0, now + 1, size=number, dtype='int64').tolist()
+        else:
+            randint = rng.randint
+            timestamps = [randint(0, now) for i in range(0, number)]
+        return [convert(timestamp) for timestamp in timestamps]
+    return column
+
+
+def timeOfDay(timestamp):
+    return datetime.time(timestamp // 3600 % 24, timestamp // 60 % 60, timestamp % 60)
+
+
+def modelLabel(model):
+    return '%s.%s' % (model._meta.app_label, model._meta.object_name)
+
+
+def charFormatter(generator, field):
+    if field.choices:
+        return lambda x: generator.randomElement(field.choices)[0]
+    return lambda x: generator.text(field.max_length) if field.max_length >= 5 else generator.word()
+
+
+def ipAddressFormatter(generator, field):
+    protocolIp = generator.randomElement(['ipv4','ipv6'])
+    return lambda x: getattr(generator,protocolIp)()
+
+
+def decimalFormatter(generator, field):
+    """
+    Random decimal that fits the max_digits and decimal_places of the field
+    """
+    limit = 10 ** field.max_digits - 1
+    places = -field.decimal_places
+    return lambda x: Decimal(generator.randomInt(-limit, limit)).scaleb(places)
 
 
 class FieldTypeGuesser(object):
+    """
+    Guess the formatter of a field from its type.
+
+    The formatters are looked up by the classes of the MRO of the field type,
+    so the most specific registered class wins, and the lookup is cached by
+    field type. Custom field types add their formatters with register().
+    """
+
+    # field class -> callable(generator, field) returning the formatter
+    formatters = {
+        BooleanField: lambda generator, field: lambda x: generator.boolean(),
+        NullBooleanField: lambda generator, field: lambda x: generator.nullBoolean(),
+        DecimalField: decimalFormatter,
+        SmallIntegerField: lambda generator, field: lambda x: generator.randomInt(0,32767),
+        IntegerField: lambda generator, field: lambda x: generator.randomInt(0,2147483647),
+        BigIntegerField: lambda generator, field: lambda x: generator.randomInt(0,9223372036854775807),
+        FloatField: lambda generator, field: lambda x: generator.pyfloat(),
+        CharField: charFormatter,
+        TextField: lambda generator, field: lambda x: generator.text(),
+
+        DateTimeField: lambda generator, field: dateTimeFormatter(generator),
+        DateField: lambda generator, field: lambda x: datetime.date.fromtimestamp(
+            generator.randomInt(0, referenceTime(generator))),
+        TimeField: lambda generator, field: lambda x: timeOfDay(generator.randomInt(0, 86399)),
+
+        URLField: lambda generator, field: lambda x: generator.uri(),
+        SlugField: lambda generator, field: lambda x: generator.slug(),
+        IPAddressField: ipAddressFormatter,
+        EmailField: lambda generator, field: lambda x: generator.email(),
+        ImageField: lambda generator, field: lambda x: None,
+    }
+
+    # field class -> callable(field) returning the column formatter, or None
+    # when the field has no column formatter
+    batchFormatters = {
+        BooleanField: lambda field: booleanColumn,
+        NullBooleanField: lambda field: nullBooleanColumn,
+        DecimalField: decimalColumn,
+        # non-negative values of the signed column types
+        SmallIntegerField: lambda field: bitsColumn(15),
+        IntegerField: lambda field: bitsColumn(31),
+        BigIntegerField: lambda field: bitsColumn(63),
+        FloatField: lambda field: floatColumn,
+        CharField: None,
+        TextField: None,
+
+        DateTimeField: lambda field: timestampColumn(datetime.datetime.fromtimestamp),
+        DateField: lambda field: timestampColumn(datetime.date.fromtimestamp),
+        TimeField: lambda field: timestampColumn(timeOfDay),
+    }
+
+    # (guesser class, table, field class) -> factory, filled by dispatch()
+    dispatchCache = {}
+    # incremented by register(), invalidates the cached guesses
+    version = 0
 
     def __init__(self, generator):
         """
@@ -12,44 +198,733 @@ class FieldTypeGuesser(object):
         """
         self.generator = generator
 
+    @classmethod
+    def register(cls, fieldClass, factory, batchFactory=None):
+        """
+        Set the formatter of a field type and of its subclasses
+
+            FieldTypeGuesser.register(MoneyField, lambda generator, field: lambda x: generator.randomInt(0, 1000))
+
+        :param fieldClass: Field subclass
+        :param factory: callable with the generator and the field as arguments,
+            returning the formatter of the field
+        :param batchFactory: optional callable with the field as argument,
+            returning the column formatter of the field, see guessBatchFormat
+        """
+        cls.formatters[fieldClass] = factory
+        cls.batchFormatters[fieldClass] = batchFactory
+        cls.dispatchCache.clear()
+        FieldTypeGuesser.version += 1
+
+    @classmethod
+    def dispatch(cls, table, fieldClass):
+        """
+        The factory of the first class of the MRO of `fieldClass` in the
+        table `table` ('formatters' or 'batchFormatters')
+
+        :rtype: callable, None, or KeyError when no class is registered
+        """
+        key = (cls, table, fieldClass)
+        try:
+            return cls.dispatchCache[key]
+        except KeyError:
+            pass
+        factories = getattr(cls, table)
+        factory = KeyError
+        for klass in fieldClass.__mro__:
+            if klass in factories:
+                factory = factories[klass]
+                break
+        cls.dispatchCache[key] = factory
+        return factory
+
     def guessFormat(self, field):
 
-        generator = self.generator
-        if isinstance(field, BooleanField): return lambda x: generator.boolean()
-        if isinstance(field, NullBooleanField): return lambda x: generator.nullBoolean()
-        if isinstance(field, DecimalField): return lambda x: generator.pydecimal(rightDigits=field.decimal_places)
-        if isinstance(field, SmallIntegerField): return lambda x: generator.randomInt(0,65535)
-        if isinstance(field, IntegerField): return lambda x: generator.randomInt(0,4294967295)
-        if isinstance(field, BigIntegerField): return lambda x: generator.randomInt(0,18446744073709551615)
-        if isinstance(field, FloatField): return lambda x: generator.pyfloat()
-        if isinstance(field, CharField):
-            if field.choices:
-                return lambda x: generator.randomElement(field.choices)[0]
-            return lambda x: generator.text(field.max_length) if field.max_length >= 5 else generator.word()
-        if isinstance(field, TextField): return lambda x: generator.text()
-
-        if isinstance(field, DateTimeField): return lambda x: generator.dateTime()
-        if isinstance(field, DateField): return lambda x: generator.date()
-        if isinstance(field, TimeField): return lambda x: generator.time()
-
-        if isinstance(field, URLField): return lambda x: generator.uri()
-        if isinstance(field, SlugField): return lambda x: generator.slug()
-        if isinstance(field, IPAddressField):
-            protocolIp = generator.randomElements(['ipv4','ipv6'])
-            return lambda x: getattr(generator,protocolIp)()
-        if isinstance(field, EmailField): return lambda x: generator.email()
-        if isinstance(field, ImageField): return lambda x: None
-
-        raise AttributeError(field)
+        factory = self.dispatch('formatters', type(field))
+        if factory is KeyError:
+            raise AttributeError(field)
+        return factory(self.generator, field)
+
+    def guessBatchFormat(self, field):
+        """
+        Formatter of a whole column, for the field types that can be generated
+        without a faker call per value. The column formatter is called with a
+        random.Random-like instance and the number of values.
+
+        :rtype: callable or None
+        """
+        factory = self.dispatch('batchFormatters', type(field))
+        if factory is KeyError or factory is None:
+            return None
+        return factory(field)
+
+
+class PkRange(object):
+    """
+    Run of consecutive integer PKs, from start to stop excluded
+    """
+
+    __slots__ = ('start', 'stop')
+
+    def __init__(self, start, stop):
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        return self.start + index
+
+    def __iter__(self):
+        return iter(xrange(self.start, self.stop))
+
+    def __getstate__(self):
+        return self.start, self.stop
+
+    def __setstate__(self, state):
+        self.start, self.stop = state
+
+
+def isRange(values):
+    """
+    True when a range/xrange has a step of 1
+    """
+    return isinstance(values, (xrange, PkRange)) and (
+        len(values) < 2 or values[1] - values[0] == 1)
+
+
+class InsertedPks(object):
+    """
+    Compact list of the PKs inserted for a model.
+
+    Runs of consecutive integer PKs are kept as ranges, the other integer PKs
+    in arrays of 64 bit integers (where the platform has them) and any other PK (strings, UUIDs..) in lists.
+
+    With `reservoirSize` only a bounded random sample of the PKs is kept: the
+    PKs are still counted by len(), but only the sample is iterated and
+    indexed. choice() and sample() work in both cases.
+    """
+
+    minRange = 3
+    minInt = -2 ** (array(pkTypecode).itemsize * 8 - 1)
+    maxInt = 2 ** (array(pkTypecode).itemsize * 8 - 1) - 1
+
+    def __init__(self, pks=None, reservoirSize=None, rng=None):
+        """
+        :param pks: optional iterable of PKs
+        :param reservoirSize: optional int The number of PKs kept in the sample
+        :type reservoirSize: integer or None
+        :param rng: optional random.Random used for the sample, by default the
+            random module (not stored, the PKs are pickled for the workers)
+        """
+        self.reservoirSize = reservoirSize
+        self.random = rng
+        self.count = 0
+        self.segments = []
+        self.offsets = None
+        self.reservoir = []
+        self.reservoirIndexes = array(pkTypecode)
+        if pks is not None:
+            self.extend(pks)
+
+    def append(self, pk):
+        index = self.count
+        self.count += 1
+        if self.reservoirSize is not None:
+            self._sample(pk, index)
+            return
+
+        self.offsets = None
+        segments = self.segments
+        last = segments[-1] if segments else None
+
+        if not isinstance(pk, integer_types) or not self.minInt <= pk <= self.maxInt:
+            if isinstance(last, list):
+                last.append(pk)
+            else:
+                segments.append([pk])
+            return
+
+        if isinstance(last, PkRange):
+            if pk == last.stop:
+                last.stop += 1
+                return
+            if len(last) < self.minRange:
+                # fold a short run in the array of the previous PKs
+                segments.pop()
+                previous = segments[-1] if segments else None
+                if not isinstance(previous, array):
+                    previous = array(pkTypecode)
+                    segments.append(previous)
+                previous.extend(last)
+                previous.append(pk)
+                return
+        elif isinstance(last, array) and pk == last[-1] + 1:
+            # start a new run from the last PK of the array
+            start = last.pop()
+            if not last:
+                segments.pop()
+            segments.append(PkRange(start, pk + 1))
+            return
+        elif isinstance(last, array):
+            last.append(pk)
+            return
+
+        segments.append(PkRange(pk, pk + 1))
+
+    def extend(self, pks):
+        if self.reservoirSize is None and isRange(pks) and len(pks) >= self.minRange:
+            last = self.segments[-1] if self.segments else None
+            if isinstance(last, PkRange) and last.stop == pks[0]:
+                last.stop += len(pks)
+            else:
+                self.segments.append(PkRange(pks[0], pks[0] + len(pks)))
+            self.count += len(pks)
+            self.offsets = None
+            return
+        if isinstance(pks, InsertedPks) and pks.reservoirSize is None:
+            for segment in pks.segments:
+                self.extend(segment)
+            return
+        for pk in pks:
+            self.append(pk)
+
+    def _sample(self, pk, index):
+        """
+        Reservoir sampling (algorithm R)
+        """
+        if len(self.reservoir) < self.reservoirSize:
+            self.reservoir.append(pk)
+            self.reservoirIndexes.append(index)
+            return
+        slot = (self.random or random).randint(0, index)
+        if slot < self.reservoirSize:
+            self.reservoir[slot] = pk
+            self.reservoirIndexes[slot] = index
+
+    def truncate(self, length):
+        """
+        Forget the PKs appended after the first `length` ones
+        """
+        if length >= self.count:
+            return
+        self.count = length
+        if self.reservoirSize is not None:
+            kept = [(index, pk) for index, pk in zip(self.reservoirIndexes, self.reservoir) if index < length]
+            self.reservoir = [pk for index, pk in kept]
+            self.reservoirIndexes = array(pkTypecode, [index for index, pk in kept])
+            return
+        self.offsets = None
+        size = 0
+        for position, segment in enumerate(self.segments):
+            if size + len(segment) >= length:
+                del self.segments[position + 1:]
+                keep = length - size
+                if not keep:
+                    self.segments.pop()
+                elif isinstance(segment, PkRange):
+                    segment.stop = segment.start + keep
+                else:
+                    del segment[keep:]
+                return
+            size += len(segment)
+
+    def choice(self, rng=random):
+        """
+        A random PK
+        """
+        if self.reservoirSize is not None:
+            return self.reservoir[int(rng.random() * len(self.reservoir))]
+        return self[int(rng.random() * self.count)]
+
+    def sample(self, k, rng=random):
+        """
+        `k` distinct random PKs
+        """
+        if self.reservoirSize is not None:
+            return rng.sample(self.reservoir, min(k, len(self.reservoir)))
+        return [self[index] for index in rng.sample(xrange(self.count), min(k, self.count))]
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        if self.reservoirSize is not None:
+            return iter(self.reservoir)
+        return chain.from_iterable(self.segments)
+
+    def __getitem__(self, index):
+        if self.reservoirSize is not None:
+            return self.reservoir[index]
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError('InsertedPks index out of range')
+        if self.offsets is None:
+            self.offsets = []
+            size = 0
+            for segment in self.segments:
+                self.offsets.append(size)
+                size += len(segment)
+        position = bisect_right(self.offsets, index) - 1
+        return self.segments[position][index - self.offsets[position]]
+
+    def __delitem__(self, index):
+        if not isinstance(index, slice) or index.stop is not None or index.step is not None:
+            raise TypeError('InsertedPks supports only the deletion of a tail, del pks[start:]')
+        self.truncate(index.start or 0)
+
+    def __contains__(self, pk):
+        for segment in self.segments if self.reservoirSize is None else [self.reservoir]:
+            if isinstance(segment, PkRange):
+                if isinstance(pk, integer_types) and segment.start <= pk < segment.stop:
+                    return True
+            elif pk in segment:
+                return True
+        return False
+
+    def __eq__(self, other):
+        if isinstance(other, (InsertedPks, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        if self.reservoirSize is not None:
+            return '<InsertedPks: %d PKs, sample of %d>' % (self.count, len(self.reservoir))
+        if self.count > 20:
+            return '<InsertedPks: %d PKs>' % self.count
+        return repr(list(self))
+
+
+class PopulationError(Exception):
+    """
+    Raised when the population of an entity fails.
+
+    `insertedEntities` holds the PKs written before the failure, when the
+    population was atomic the rows of the failed chunk are not included.
+    """
+
+    def __init__(self, model, done, insertedEntities, error):
+        super(PopulationError, self).__init__('Population of "%s" failed after %d rows: %s' % (
+            model.__name__, done, error,
+        ))
+        self.model = model
+        self.done = done
+        self.insertedEntities = insertedEntities
+        self.error = error
+
+
+class RelationFormatter(object):
+    """
+    Pick a random related value for a ForeignKey or OneToOneField.
+
+    The value of the related field (the PK, or the `to_field`) is assigned
+    to the field attname (e.g. `game_id`), so no query is needed to load the
+    related instance. When the related model was not populated in the current
+    run, or the relation is not to its PK, a bounded random sample of its rows
+    is loaded once per execute.
+    """
+
+    sampleSize = 1000
+    # the sample of a larger table is read in windows of contiguous rows at
+    # random offsets
+    sampleWindows = 10
+
+    def __init__(self, field):
+        """
+        :param field: ForeignKey
+        """
+        self.field = field
+        self.relatedModel = field.rel.to
+        self.relatedField = field.rel.get_related_field()
+        self.attname = field.attname
+        self.random = random.Random()
+        self.using = None
+        self.sample = None
+
+    def prepare(self, using):
+        self.using = using
+        self.sample = None
+
+    def relatedPks(self, inserted):
+        """
+        The inserted PKs of the related model, or a sample of its rows
+        """
+        pks = inserted.get(self.relatedModel) if self.relatedField.primary_key else None
+        if not pks:
+            if self.sample is None:
+                self.sample = self.loadSample()
+            pks = self.sample
+        return pks
+
+    def loadSample(self):
+        """
+        The values of the related field of up to `sampleSize` random rows
+        """
+        queryset = self.relatedModel._default_manager.using(self.using).order_by('pk').values_list(
+            self.relatedField.name, flat=True)
+        count = queryset.count()
+        if count <= self.sampleSize:
+            return list(queryset)
+        size = max(self.sampleSize // self.sampleWindows, 1)
+        sample = []
+        for window in sorted(self.random.sample(xrange(count // size), self.sampleSize // size)):
+            sample.extend(queryset[window * size:(window + 1) * size])
+        return sample
+
+    def __call__(self, inserted):
+        pks = self.relatedPks(inserted)
+        if pks:
+            if isinstance(pks, InsertedPks):
+                return pks.choice(self.random)
+            return self.random.choice(pks)
+        if not self.field.null:
+            raise Exception('Relation "%s.%s" with "%s" cannot be null, add an entity for "%s" or a custom formatter' % (
+                self.field.model.__name__, self.field.name, self.relatedModel.__name__, self.relatedModel.__name__,
+            ))
+        return None
+
+
+class ManyToManyFormatter(RelationFormatter):
+    """
+    Build the rows of the auto-created through table of a ManyToManyField.
+
+    The number of related rows of each row is given by `edgesPerRow`: an int,
+    a (min, max) tuple or a callable returning an int.
+    """
+
+    defaultEdgesPerRow = (0, 3)
+
+    def __init__(self, field, edgesPerRow=None):
+        """
+        :param field: ManyToManyField
+        :param edgesPerRow: int, tuple or callable
+        """
+        super(ManyToManyFormatter, self).__init__(field)
+        through = field.rel.through
+        self.through = through
+        self.sourceAttname = through._meta.get_field(field.m2m_field_name()).attname
+        self.targetAttname = through._meta.get_field(field.m2m_reverse_field_name()).attname
+        self.symmetrical = bool(getattr(field.rel, 'symmetrical', False)) and self.relatedModel is field.model
+        self.edgesPerRow = self.defaultEdgesPerRow if edgesPerRow is None else edgesPerRow
+
+    def edgeCount(self):
+        edgesPerRow = self.edgesPerRow
+        if hasattr(edgesPerRow, '__call__'):
+            return edgesPerRow()
+        if isinstance(edgesPerRow, tuple):
+            return self.random.randint(*edgesPerRow)
+        return edgesPerRow
+
+    def __call__(self, pks, inserted):
+        """
+        Unsaved through instances relating the rows of `pks`
+        """
+        targets = self.relatedPks(inserted)
+        if not targets:
+            return []
+
+        through = self.through
+        sourceAttname = self.sourceAttname
+        targetAttname = self.targetAttname
+        objs = []
+        for pk in pks:
+            count = min(self.edgeCount(), len(targets))
+            if isinstance(targets, InsertedPks):
+                chosen = targets.sample(count, self.random)
+            else:
+                chosen = self.random.sample(targets, count)
+            for target in chosen:
+                if self.symmetrical:
+                    # each pair is related once, from its greater PK, in both directions
+                    if not target < pk:
+                        continue
+                    objs.append(through(**{sourceAttname: target, targetAttname: pk}))
+                objs.append(through(**{sourceAttname: pk, targetAttname: target}))
+        return objs
+
+
+class PooledFormatter(object):
+    """
+    Wrap an expensive formatter in a pool of values.
+
+    The first calls fill the pool with up to `size` unique values, then the
+    values are sampled from the pool. The filling stops early when the
+    formatter keeps returning values already in the pool. A seeded run
+    empties the pool for every chunk (see reseed), so a chunk does not
+    depend on the chunks generated before it.
+    """
+
+    maxSize = 10000
+
+    def __init__(self, formatter, size):
+        """
+        :param formatter: callable
+        :param size: int The number of values in the pool, bounded by maxSize
+        :type size: integer
+        """
+        self.formatter = formatter
+        self.size = min(size, self.maxSize)
+        self.random = random.Random()
+        self.values = []
+        self.seen = set()
+        self.misses = 0
+
+    def __call__(self, insertedEntities):
+        values = self.values
+        if self.seen is not None:
+            value = self.formatter(insertedEntities)
+            if value in self.seen:
+                self.misses += 1
+            else:
+                self.seen.add(value)
+                values.append(value)
+            if len(values) >= self.size or self.misses >= self.size:
+                # the pool is full, the lookup set is not needed anymore
+                self.seen = None
+            return value
+        return values[int(self.random.random() * len(values))]
+
+    def reseed(self, seed):
+        """
+        Empty the pool and seed the sampling of its values
+        """
+        self.random.seed(seed)
+        self.values = []
+        self.seen = set()
+        self.misses = 0
+
+
+def suffixed(value, suffix, maxLength=None):
+    """
+    `value` with a numeric suffix, before the domain of an email, and
+    truncated to fit in `maxLength`
+    """
+    suffix = '-%d' % suffix
+    local, at, domain = value.rpartition('@') if '@' in value else (value, '', '')
+    if maxLength:
+        local = local[:max(maxLength - len(suffix) - len(at) - len(domain), 0)]
+    return local + suffix + at + domain
+
+
+class UniqueValues(object):
+    """
+    Values used for a unique constraint, kept in a UniqueSet, exact for the
+    smaller tables and a Bloom filter for the larger ones.
+
+    The workers of a parallel run do not see the values of each other, each
+    one accepts only the values of its own partition, see partition().
+    """
+
+    partitionIndex = 0
+    partitions = 1
+    # the larger tables are not read whole by prepare, see usedValues
+    scanLimit = 100000
+
+    def usedValues(self, queryset):
+        """
+        The values of a values_list queryset of the table: all of them up to
+        `scanLimit` rows, else the ones of the `scanLimit` most recent rows,
+        the most likely to be written by the previous runs
+        """
+        if self.scanLimit is not None and queryset.count() > self.scanLimit:
+            queryset = queryset.order_by('-pk')[:self.scanLimit]
+        return queryset.iterator()
+
+    def partition(self, index, count):
+        """
+        Accept only the values of the partition `index` of `count`
+        """
+        self.partitionIndex = index
+        self.partitions = count
+
+    def isFree(self, value):
+        """
+        True when the value was not used and is in the partition
+        """
+        if value in self.seen:
+            return False
+        if self.partitions == 1:
+            return True
+        parts = value if isinstance(value, tuple) else (value,)
+        return deriveSeed('unique', *parts) % self.partitions == self.partitionIndex
+
+
+class UniqueFormatter(UniqueValues):
+    """
+    Wrap the formatter of a field with a unique constraint, so it does not
+    repeat its values nor the values already in the table.
+
+    A repeated value is generated again up to `retries` times (for each
+    partition), then strings are made unique with a numeric suffix.
+    """
+
+    retries = 10
+
+    def __init__(self, formatter, field, capacity=None):
+        """
+        :param formatter: callable
+        :param field: Field with unique=True
+        :param capacity: optional int The expected number of values
+        """
+        self.formatter = formatter
+        self.field = field
+        self.capacity = capacity
+        self.seen = UniqueSet(capacity)
+        self.suffix = 0
+
+    def prepare(self, using):
+        """
+        Forget the values of the previous executes, and load the values in the
+        table when `using` is given
+        """
+        self.seen = seen = UniqueSet(self.capacity)
+        if using is None:
+            return
+        queryset = self.field.model._base_manager.using(using).values_list(self.field.attname, flat=True)
+        for value in self.usedValues(queryset):
+            if value is not None:
+                seen.add(value)
+
+    def __call__(self, insertedEntities):
+        value = self.formatter(insertedEntities)
+        for i in range(0, self.retries * self.partitions):
+            if value is None or self.isFree(value):
+                break
+            value = self.formatter(insertedEntities)
+        else:
+            value = self.unique(value)
+        if value is not None:
+            self.seen.add(value)
+        return value
+
+    def unique(self, value):
+        if not isinstance(value, string_types):
+            raise ValueError('Cannot generate a unique value for "%s.%s", last value %r' % (
+                self.field.model.__name__, self.field.name, value,
+            ))
+        while True:
+            self.suffix += 1
+            candidate = suffixed(value, self.suffix, self.field.max_length)
+            if self.isFree(candidate):
+                return candidate
+
+
+class UniqueTogether(UniqueValues):
+    """
+    Values used for a unique_together constraint of a model
+    """
+
+    def __init__(self, model, names, capacity=None):
+        """
+        :param model: Model
+        :param names: tuple The names of the fields of the constraint
+        :param capacity: optional int The expected number of rows
+        """
+        self.model = model
+        self.attnames = tuple([model._meta.get_field(name).attname for name in names])
+        self.capacity = capacity
+        self.seen = UniqueSet(capacity)
+
+    def prepare(self, using):
+        self.seen = seen = UniqueSet(self.capacity)
+        if using is None:
+            return
+        for values in self.usedValues(self.model._base_manager.using(using).values_list(*self.attnames)):
+            seen.add(tuple(values))
+
+    def key(self, row):
+        """
+        The values of the constraint in a row, None when one of them is NULL
+        """
+        values = tuple([row.get(attname) for attname in self.attnames])
+        if None in values:
+            return None
+        return values
+
+
+class UniqueRelationFormatter(RelationFormatter, UniqueValues):
+    """
+    Pick each related value at most once, for a OneToOneField or a
+    ForeignKey with unique=True.
+
+    The related values not used by the rows in the table are shuffled once
+    per execute and handed out in turn, a new sample is loaded when the one
+    of a related model not populated in the current run is used up.
+    """
+
+    def __init__(self, field):
+        super(UniqueRelationFormatter, self).__init__(field)
+        self.seen = set()
+        self.free = None
+
+    def prepare(self, using):
+        super(UniqueRelationFormatter, self).prepare(using)
+        self.seen = seen = set()
+        self.free = None
+        if using is None:
+            return
+        queryset = self.field.model._base_manager.using(using).values_list(self.attname, flat=True)
+        for value in self.usedValues(queryset):
+            if value is not None:
+                seen.add(value)
+
+    def freeValues(self, inserted):
+        """
+        The related values not used yet, shuffled
+        """
+        free = [value for value in self.relatedPks(inserted) or [] if self.isFree(value)]
+        self.random.shuffle(free)
+        return free
+
+    def __call__(self, inserted):
+        if self.free is None:
+            self.free = self.freeValues(inserted)
+        if not self.free and self.sample:
+            # only the values of the sample were used, try another one
+            self.sample = None
+            self.free = self.freeValues(inserted)
+        if self.free:
+            value = self.free.pop()
+            self.seen.add(value)
+            return value
+        if not self.field.null:
+            raise ValueError('No unused "%s" left for "%s.%s", add more rows of "%s"' % (
+                self.relatedModel.__name__, self.field.model.__name__, self.field.name, self.relatedModel.__name__,
+            ))
+        return None
 
 
 class ModelPopulator(object):
+
+    # (class, model, guess, codename or id(generator)) -> (generator, signature, formatters),
+    # bounded since the entries keep their generator alive
+    formatterCache = LRUCache(maxsize=256)
+
     def __init__(self, model):
         """
         :param model: Generator
         """
         self.model = model
         self.fieldFormatters = {}
+        self.batchFormatters = {}
+        self.manyToManyFormatters = {}
+        self.columnFormatters = {}
+        self.columnRandoms = {}
+        self.rowFactory = None
+        self.columnsRowFactory = None
+        self.useCopy = True
+        self.profiler = None
+        self.uniqueTogether = []
 
     def guessFieldFormatters(self, generator):
 
@@ -61,23 +936,8 @@ class ModelPopulator(object):
         for field in model._meta.fields:
         #            yield field.name, getattr(self, field.name)
             fieldName = field.name
-            if isinstance(field, (ForeignKey,ManyToManyField,OneToOneField)):
-                relatedModel = field.rel.to
-
-                def build_relation(inserted):
-                    if relatedModel in inserted and inserted[relatedModel]:
-                        return relatedModel.objects.get(pk=random.choice(inserted[relatedModel]))
-                    if not field.null:
-                        try :
-                            # try to retrieve random object from relatedModel
-                            relatedModel.objects.order_by('?')[0]
-                        except IndexError:
-                            raise Exception('Relation "%s.%s" with "%s" cannot be null, check order of addEntity list' % (
-                                field.model.__name__, field.name, relatedModel.__name__,
-                            ))
-                    return None
-
-                formatters[fieldName] = build_relation
+            if isinstance(field, (ForeignKey,OneToOneField)):
+                formatters[fieldName] = RelationFormatter(field)
                 continue
 
             if isinstance(field, AutoField):
@@ -95,33 +955,376 @@ class ModelPopulator(object):
 
         return formatters
 
-    def execute(self, using, insertedEntities):
+    def getFieldFormatters(self, generator, codename=None):
+        """
+        guessFieldFormatters() cached by model and generator, see cachedGuess()
+        """
+        formatters = self.cachedGuess('guessFieldFormatters', generator, codename)
+        # the relation formatters keep the state of an execute
+        return dict([(field, RelationFormatter(format.field) if isinstance(format, RelationFormatter) else format)
+                     for field, format in formatters.items()])
+
+    def getBatchFormatters(self, generator, codename=None):
+        """
+        guessBatchFormatters() cached by model and generator, see cachedGuess()
+        """
+        return dict(self.cachedGuess('guessBatchFormatters', generator, codename))
+
+    def cachedGuess(self, guess, generator, codename=None):
+        """
+        Result of the guess method `guess`, cached by populator class, model
+        and generator codename (or generator instance) until the fields of the
+        model or the guesser tables change.
+
+        :rtype: dict, shared by the callers, not to be modified
+        """
+        key = (type(self), self.model, guess, codename or id(generator))
+        signature = self.signature()
+        cached = self.formatterCache.get(key)
+        if cached and cached[0] is generator and cached[1] == signature:
+            return cached[2]
+        formatters = getattr(self, guess)(generator)
+        self.formatterCache[key] = (generator, signature, formatters)
+        return formatters
+
+    def signature(self):
+        """
+        Identity of the fields of the model and of the guesser tables
+        """
+        return tuple([id(field) for field in self.model._meta.fields]) + (Name.version, FieldTypeGuesser.version)
+
+    def guessManyToManyFormatters(self, edgesPerRow=None):
+        """
+        Formatters of the ManyToManyFields with an auto-created through table.
+
+        :param edgesPerRow: optional dict with field as key and edgesPerRow as
+            value, or edgesPerRow for all the fields, see ManyToManyFormatter
+        """
+        formatters = {}
+        for field in self.model._meta.many_to_many:
+            if not field.rel.through._meta.auto_created:
+                continue
+            if isinstance(edgesPerRow, dict):
+                if field.name not in edgesPerRow:
+                    continue
+                formatters[field.name] = ManyToManyFormatter(field, edgesPerRow[field.name])
+            else:
+                formatters[field.name] = ManyToManyFormatter(field, edgesPerRow)
+        return formatters
 
-        obj = self.model()
+    def guessBatchFormatters(self, generator):
+        """
+        Column formatters for the fields guessed by type, see
+        FieldTypeGuesser.guessBatchFormat
+        """
+        formatters = {}
+        nameGuesser = Name(generator)
+        fieldTypeGuesser = FieldTypeGuesser(generator)
 
-        for field, format in self.fieldFormatters.items():
-            if format:
-                value = format(insertedEntities) if hasattr(format,'__call__') else format
-                setattr(obj, field, value)
+        for field in self.model._meta.fields:
+            if isinstance(field, (ForeignKey, OneToOneField, AutoField)):
+                continue
+            if nameGuesser.guessFormat(field.name):
+                continue
+            formatter = fieldTypeGuesser.guessBatchFormat(field)
+            if formatter:
+                formatters[field.name] = formatter
+
+        return formatters
+
+    def poolFormatters(self, sizes):
+        """
+        Wrap the field formatters in PooledFormatter.
+
+        :param sizes: dict with field as key and pool size as value, or a pool
+            size for all the text fields without choices and unique constraint
+        :type sizes: dict or integer
+        """
+        if not isinstance(sizes, dict):
+            sizes = dict([(field.name, sizes) for field in self.model._meta.fields
+                          if isinstance(field, (CharField, TextField))
+                          and not (field.choices or field.unique or field.primary_key)])
+
+        for field, size in sizes.items():
+            format = self.fieldFormatters.get(field)
+            if hasattr(format, '__call__') and not isinstance(format, (RelationFormatter, PooledFormatter)):
+                self.fieldFormatters[field] = PooledFormatter(format, size)
+
+    def uniqueFormatters(self, capacity=None):
+        """
+        Wrap the formatters of the fields with a unique constraint in
+        UniqueFormatter, generating them a row at a time, pick the related
+        rows of the unique relations once (see UniqueRelationFormatter) and
+        collect the unique_together constraints of the model.
+
+        :param capacity: optional int The expected number of rows
+        """
+        for field in self.model._meta.fields:
+            if not field.unique:
+                continue
+            self.batchFormatters.pop(field.name, None)
+            format = self.fieldFormatters.get(field.name)
+            if type(format) is RelationFormatter:
+                self.fieldFormatters[field.name] = UniqueRelationFormatter(field)
+                continue
+            if hasattr(format, '__call__') and not isinstance(format, (RelationFormatter, UniqueFormatter)):
+                self.fieldFormatters[field.name] = UniqueFormatter(format, field, capacity)
+
+        self.uniqueTogether = [UniqueTogether(self.model, names, capacity)
+                               for names in self.model._meta.unique_together]
+
+    def uniqueRow(self, row, insertedEntities):
+        """
+        `row`, or a new row when its values of a unique_together constraint were already used
+        """
+        partitions = max([constraint.partitions for constraint in self.uniqueTogether])
+        for i in range(0, UniqueFormatter.retries * partitions):
+            keys = [(constraint, constraint.key(row)) for constraint in self.uniqueTogether]
+            if not [key for constraint, key in keys if key is not None and not constraint.isFree(key)]:
+                for constraint, key in keys:
+                    if key is not None:
+                        constraint.seen.add(key)
+                return row
+            row = self.rowFactory(insertedEntities)
+        raise ValueError('Cannot generate a row of "%s" unique together on %s' % (
+            self.model.__name__, ', '.join([str(constraint.attnames) for constraint in self.uniqueTogether]),
+        ))
+
+    def partitionUnique(self, index, count):
+        """
+        Generate only the unique values of the partition `index` of `count`,
+        in the worker `index` of a parallel run
+        """
+        for format in self.fieldFormatters.values():
+            if isinstance(format, UniqueValues):
+                format.partition(index, count)
+        for constraint in self.uniqueTogether:
+            constraint.partition(index, count)
+
+    def compile(self):
+        """
+        Build the row factory from the field formatters.
+
+        Constant formatters are resolved once here, the row factory only
+        calls the callable ones, and returns the keyword arguments of a
+        new model instance. The columns row factory leaves out the fields
+        generated by the batch formatters.
+
+        With a profiler the formatters are wrapped to record their time.
+        """
+        profiler = self.profiler
+        constants = {}
+        callables = []
+        # a stable order of the calls, for seeded generators
+        for field, format in sorted(self.fieldFormatters.items(), key=lambda item: item[0]):
+            if not format:
+                continue
+            if isinstance(format, RelationFormatter):
+                field = format.attname
+            if hasattr(format, '__call__'):
+                if profiler:
+                    format = profiler.wrap(self.model, field, format)
+                callables.append((field, format))
+            else:
+                constants[field] = format
+
+        self.columnFormatters = dict(self.batchFormatters)
+        if profiler:
+            for field, format in self.batchFormatters.items():
+                self.columnFormatters[field] = profiler.wrapColumn(self.model, field, format)
+
+        def makeRowFactory(callables):
+            def rowFactory(insertedEntities):
+                row = constants.copy()
+                for field, format in callables:
+                    row[field] = format(insertedEntities)
+                return row
+            return rowFactory
+
+        self.rowFactory = makeRowFactory(callables)
+        self.columnsRowFactory = makeRowFactory(
+            [(field, format) for field, format in callables if field not in self.batchFormatters])
+        return self.rowFactory
+
+    def buildRows(self, insertedEntities, number):
+        """
+        Keyword arguments of `number` new model instances, the batch
+        formatters generate their fields a column at a time.
+        """
+        if self.rowFactory is None:
+            self.compile()
+        if not self.batchFormatters:
+            rowFactory = self.rowFactory
+            rows = [rowFactory(insertedEntities) for i in range(0, number)]
+        else:
+            rowFactory = self.columnsRowFactory
+            rows = [rowFactory(insertedEntities) for i in range(0, number)]
+            for field, format in self.columnFormatters.items():
+                for row, value in zip(rows, format(self.columnRandoms.get(field, random), number)):
+                    row[field] = value
+        if self.uniqueTogether:
+            rows = [self.uniqueRow(row, insertedEntities) for row in rows]
+        return rows
+
+    def reseed(self, seed, pinnedTime=None):
+        """
+        Seed the random state of the formatters, each field from its own
+        seed derived from `seed`
+
+        :param pinnedTime: optional int, the end of the random dates of the
+            columns, see django_faker.utils.referenceTime
+        """
+        formatters = list(self.fieldFormatters.items()) + list(self.manyToManyFormatters.items())
+        for field, format in formatters:
+            if isinstance(format, PooledFormatter):
+                format.reseed(deriveSeed(seed, field))
+            elif isinstance(format, RelationFormatter):
+                format.random.seed(deriveSeed(seed, field))
+        self.columnRandoms = {}
+        for field in self.columnFormatters:
+            rng = self.columnRandoms[field] = random.Random(deriveSeed(seed, field))
+            pinTime(rng, pinnedTime)
+
+    def prepare(self, using):
+        """
+        Reset the per-execute state of the formatters
+        """
+        for format in self.fieldFormatters.values():
+            if isinstance(format, (RelationFormatter, UniqueFormatter)):
+                format.prepare(using)
+        for format in self.manyToManyFormatters.values():
+            format.prepare(using)
+        for constraint in self.uniqueTogether:
+            constraint.prepare(using)
+        self.compile()
+
+    def build(self, insertedEntities):
+        """
+        Create an unsaved instance of the model filled by the field formatters.
+        """
+        rowFactory = self.rowFactory or self.compile()
+        row = rowFactory(insertedEntities)
+        if self.uniqueTogether:
+            row = self.uniqueRow(row, insertedEntities)
+        return self.model(**row)
+
+    def execute(self, using, insertedEntities):
+
+        obj = self.build(insertedEntities)
 
         obj.save(using=using)
 
         return obj.pk
 
+    def executeBatch(self, using, insertedEntities, number, firstPk=None):
+        """
+        Build `number` unsaved instances and write them with a single bulk_create.
+
+        bulk_create does not report the inserted PKs back on most backends,
+        so AutoField PKs are assigned before the insert and the database
+        sequence is moved past them afterwards. When `firstPk` is given the
+        PKs are taken from it and realigning the sequence is left to the caller.
+
+        On PostgreSQL the rows are written with COPY, see django_faker.loaders,
+        unless `useCopy` is False. Without `using` the rows are written to the
+        database of the router.
+
+        :rtype: A list of the inserted PKs
+        """
+        using = using or router.db_for_write(self.model)
+        return self.writeRows(using, self.buildRows(insertedEntities, number), firstPk)
+
+    def writeRows(self, using, rows, firstPk=None):
+        """
+        Write rows built by buildRows(), see executeBatch
+
+        :rtype: A list of the inserted PKs
+        """
+        if self.useCopy:
+            from django_faker import loaders
+            if loaders.supportsCopy(using):
+                return loaders.copyRows(self, using, rows, firstPk)
+
+        model = self.model
+        objs = [model(**row) for row in rows]
+
+        autoPk = self.hasAutoPk()
+        if autoPk:
+            resetSequence = firstPk is None
+            if resetSequence:
+                firstPk = self.nextPk(using)
+            for i, obj in enumerate(objs):
+                obj.pk = firstPk + i
+
+        self.model._base_manager.using(using).bulk_create(objs)
+
+        if autoPk and resetSequence:
+            self.resetSequence(using)
+
+        return [obj.pk for obj in objs]
+
+    def executeManyToMany(self, using, pks, insertedEntities, batchSize=None):
+        """
+        Relate the rows of `pks`, writing the through tables with bulk_create
+        """
+        batchSize = batchSize or 1000
+        for format in self.manyToManyFormatters.values():
+            manager = format.through._base_manager.using(using)
+            for start in range(0, len(pks), batchSize):
+                objs = format(pks[start:start + batchSize], insertedEntities)
+                if objs:
+                    manager.bulk_create(objs)
+
+    def hasAutoPk(self):
+        return isinstance(self.model._meta.pk, AutoField)
+
+    def nextPk(self, using):
+        """
+        First free value of an integer PK
+        """
+        pkName = self.model._meta.pk.name
+        maxPk = self.model._base_manager.using(using).aggregate(maxPk=Max(pkName))['maxPk']
+        return (maxPk or 0) + 1
+
+    def resetSequence(self, using):
+        """
+        Realign the PK sequence of the model after explicit PKs were inserted
+        """
+        connection = connections[using or router.db_for_write(self.model)]
+        statements = connection.ops.sequence_reset_sql(no_style(), [self.model])
+        if statements:
+            cursor = connection.cursor()
+            for sql in statements:
+                cursor.execute(sql)
+
 
 class Populator(object):
 
-    def __init__(self, generator):
+    # the end of the random dates of the seeded runs, 2020-01-01 00:00 UTC
+    seededTime = 1577836800
+
+    def __init__(self, generator, profiler=None, seed=None, codename=None, pinnedTime=None):
         """
         :param generator: Generator
+        :param profiler: optional django_faker.profiling.Profiler
+        :param seed: optional int, makes the generated rows reproducible, see reseed()
+        :param codename: optional str, the codename of the generator, the key of
+            the guessed formatters in the cache of ModelPopulator
+        :param pinnedTime: optional int, the timestamp ending the random dates
+            of a seeded run, by default seededTime
         """
         self.generator = generator
+        self.codename = codename
+        self.profiler = profiler
+        self.seed = seed
+        self.pinnedTime = pinnedTime
         self.entities = {}
         self.quantities = {}
         self.orders = []
 
 
-    def addEntity(self, model, number, customFieldFormatters=None):
+    def addEntity(self, model, number, customFieldFormatters=None, vectorize=False, poolSizes=None,
+                  edgesPerRow=None, unique=True):
         """
         Add an order for the generation of $number records for $entity.
 
@@ -131,39 +1334,269 @@ class Populator(object):
         :type number: integer
         :param customFieldFormatters: optional dict with field as key and callable as value
         :type customFieldFormatters: dict or None
+        :param vectorize: generate numeric, boolean and date fields a column
+            at a time when rows are written in batches
+        :type vectorize: bool
+        :param poolSizes: optional dict with field as key and pool size as value,
+            or a pool size for all the text fields, see PooledFormatter
+        :type poolSizes: dict or integer or None
+        :param edgesPerRow: the number of related rows of the ManyToManyFields,
+            an int, a (min, max) tuple or a callable, or a dict with field as
+            key and one of them as value, see ManyToManyFormatter
+        :type edgesPerRow: integer, tuple, callable, dict or None
+        :param unique: do not repeat the values of the fields with a unique
+            constraint and of the unique_together fields, nor the values
+            already in the table, see UniqueFormatter
+        :type unique: bool
         """
         if not isinstance(model, ModelPopulator):
             model = ModelPopulator(model)
 
-        model.fieldFormatters = model.guessFieldFormatters( self.generator )
+        model.fieldFormatters = model.getFieldFormatters( self.generator, self.codename )
         if customFieldFormatters:
             model.fieldFormatters.update(customFieldFormatters)
+        if vectorize:
+            model.batchFormatters = dict([(field, format)
+                for field, format in model.getBatchFormatters( self.generator, self.codename ).items()
+                if field not in (customFieldFormatters or {})])
+        if poolSizes:
+            model.poolFormatters(poolSizes)
+        if unique:
+            model.uniqueFormatters(number)
+        model.manyToManyFormatters = model.guessManyToManyFormatters(edgesPerRow)
+        model.compile()
 
         klass = model.model
         self.entities[klass] = model
         self.quantities[klass] = number
         self.orders.append(klass)
 
-    def execute(self, using=None):
+    def execute(self, using=None, batchSize=None, atomic=False, chunkSize=None, processes=None, useCopy=True,
+                reservoirSize=None, checkpoint=None, resume=False, threads=None, progress=None):
         """
         Populate the database using all the Entity classes previously added.
 
         :param using A Django database connection name
-        :rtype: A list of the inserted PKs
+        :param batchSize: optional int, when given rows are written in chunks
+            of `batchSize` with bulk_create instead of one save() per row
+        :type batchSize: integer or None
+        :param atomic: wrap each chunk in a transaction, a failure rolls back
+            only the current chunk
+        :type atomic: bool
+        :param chunkSize: optional int, number of rows per chunk (defaults to
+            `batchSize`, or to the whole entity)
+        :type chunkSize: integer or None
+        :param processes: optional int, split the rows of each entity across
+            a pool of worker processes (see django_faker.parallel)
+        :type processes: integer or None
+        :param useCopy: write the batches with COPY on PostgreSQL
+        :type useCopy: bool
+        :param reservoirSize: optional int, keep only a random sample of this
+            size of the inserted PKs of each model, see InsertedPks
+        :type reservoirSize: integer or None
+        :param checkpoint: optional path of a JSON file where the progress is
+            saved after each chunk, see django_faker.checkpoint. Chunks are
+            atomic when checkpointed
+        :type checkpoint: str or None
+        :param resume: skip the chunks committed in `checkpoint` by a previous run
+        :type resume: bool
+        :param threads: optional int, populate the entities that do not relate
+            to each other at the same time, in threads with their own database
+            connection (see django_faker.scheduler). Not available to seeded
+            and checkpointed runs, the threads share the generator
+        :type threads: integer or None
+        :param progress: optional callable, called with the model, the number
+            of its rows done and the number of its rows when the population of
+            a model starts and after each chunk
+        :rtype: A dict of InsertedPks, the inserted PKs indexed by class
+        :raises PopulationError: with the PKs inserted before the failure, when
+            the run is atomic, chunked or parallel. Otherwise the error of the
+            failed row is raised as it is
         """
+        if processes and processes > 1:
+            from django_faker.parallel import ParallelExecutor
+            return ParallelExecutor(self, processes).execute(using, batchSize, atomic, chunkSize,
+                                                             useCopy=useCopy, reservoirSize=reservoirSize,
+                                                             checkpoint=checkpoint, resume=resume,
+                                                             progress=progress)
+
         if not using:
             using = self.getConnection()
 
+        chunkSize = chunkSize or batchSize
+
+        if threads and threads > 1 and (self.seed is not None or checkpoint):
+            # the threads would reseed the same generator, and the random
+            # module of the faker providers, while the others are generating
+            raise ValueError('A seeded or checkpointed population cannot use threads')
+
+        if checkpoint:
+            from django_faker.checkpoint import Checkpoint
+            checkpoint = Checkpoint.open(checkpoint, self, chunkSize, resume)
+            atomic = True
+
+        for entity in self.entities.values():
+            entity.useCopy = useCopy
+            entity.profiler = self.profiler
+            entity.prepare(using)
+        self.pinTime()
+
+        # created up front, the threads of the scheduler do not add keys
         insertedEntities = {}
         for klass in self.orders:
-            number = self.quantities[klass]
             if klass not in insertedEntities:
-                insertedEntities[klass] = []
-            for i in range(0,number):
-                    insertedEntities[klass].append( self.entities[klass].execute(using, insertedEntities) )
+                insertedEntities[klass] = InsertedPks(reservoirSize=reservoirSize, rng=self.reservoirRandom(klass))
+                if checkpoint:
+                    checkpoint.restore(klass, insertedEntities[klass])
+
+        def populate(klass):
+            if self.profiler:
+                with self.profiler.profileEntity(klass, insertedEntities[klass]):
+                    self.executeEntity(klass, using, insertedEntities, batchSize, atomic, chunkSize, checkpoint,
+                                       progress)
+            else:
+                self.executeEntity(klass, using, insertedEntities, batchSize, atomic, chunkSize, checkpoint,
+                                   progress)
+
+        from django_faker.scheduler import EntityScheduler
+        EntityScheduler(self, threads).execute(populate, using)
 
         return insertedEntities
 
+    def executeAsync(self, using=None, batchSize=1000, atomic=False, queueSize=2, executor=None, useCopy=True,
+                     reservoirSize=None):
+        """
+        Coroutine populating the database from asyncio code, the generation
+        of the next batch overlaps the write of the current one, see
+        django_faker.aio (Python 3.5+)
+
+            insertedPks = await populator.executeAsync(batchSize=1000)
+
+        :param using A Django database connection name
+        :param batchSize: int The number of rows generated and written at a time
+        :type batchSize: integer
+        :param atomic: wrap each batch in a transaction
+        :type atomic: bool
+        :param queueSize: int The number of generated batches waiting to be
+            written before the generation waits
+        :type queueSize: integer
+        :param executor: optional concurrent.futures thread executor for the
+            generation, by default a thread of its own
+        :param useCopy: write the batches with COPY on PostgreSQL
+        :type useCopy: bool
+        :param reservoirSize: see execute()
+        :type reservoirSize: integer or None
+        :rtype: A coroutine returning a dict of InsertedPks, the inserted PKs indexed by class
+        """
+        from django_faker.aio import execute
+        return execute(self, using, batchSize, atomic, queueSize, executor, useCopy, reservoirSize)
+
+    def executeEntity(self, klass, using, insertedEntities, batchSize=None, atomic=False, chunkSize=None,
+                      checkpoint=None, progress=None):
+        """
+        Insert all the rows of an entity, a chunk at a time
+        """
+        number = self.quantities[klass]
+        entity = self.entities[klass]
+        pks = insertedEntities[klass]
+        size = chunkSize or number or 1
+        if progress:
+            progress(klass, 0, number)
+        for start in range(0, number, size):
+            if checkpoint and checkpoint.isDone(klass, start // size):
+                continue
+            done = len(pks)
+            if self.seed is not None:
+                self.reseed(entity, start // size)
+            try:
+                if atomic:
+                    with transaction.atomic(using=using):
+                        self.executeChunk(entity, using, insertedEntities, min(size, number - start), batchSize)
+                else:
+                    self.executeChunk(entity, using, insertedEntities, min(size, number - start), batchSize)
+            except Exception as e:
+                if not (atomic or chunkSize):
+                    # a plain row by row run raises the error of the row as it is
+                    raise
+                if atomic:
+                    del pks[done:]
+                raise PopulationError(klass, len(pks), insertedEntities, e)
+            if checkpoint:
+                checkpoint.record(klass, start // size, pks)
+            if progress:
+                progress(klass, min(start + size, number), number)
+
+    def reseed(self, entity, chunk, seed=None):
+        """
+        Seed the generator and the formatters of an entity for one of its chunks.
+
+        The seed is derived from the seed of the populator, the model and the
+        chunk index, and every formatter with its own random state derives its
+        seed from it and the field name: the same chunk of a model generates
+        the same rows in any run, process or worker.
+        """
+        seed = deriveSeed(self.seed if seed is None else seed, modelLabel(entity.model), chunk)
+        self.generator.seed(seed)
+        self.pinTime()
+        entity.reseed(seed, self.getPinnedTime())
+
+    def getPinnedTime(self):
+        """
+        The end of the random dates: fixed for a seeded run, so its dates do
+        not depend on the day it runs, None (now) otherwise
+        """
+        if self.seed is None:
+            return None
+        return self.seededTime if self.pinnedTime is None else self.pinnedTime
+
+    def pinTime(self):
+        """
+        Pin the end of the random dates of the generator for a run, see getPinnedTime
+        """
+        pinTime(self.generator, self.getPinnedTime())
+
+    def reservoirRandom(self, klass):
+        if self.seed is None:
+            return None
+        return random.Random(deriveSeed(self.seed, modelLabel(klass), 'reservoir'))
+
+    def executeChunk(self, entity, using, insertedEntities, number, batchSize=None, firstPk=None):
+        """
+        Insert `number` rows of an entity, appending their PKs to insertedEntities
+        """
+        if self.profiler:
+            with self.profiler.profileQueries(entity.model, using):
+                self.writeChunk(entity, using, insertedEntities, number, batchSize, firstPk)
+            return
+        self.writeChunk(entity, using, insertedEntities, number, batchSize, firstPk)
+
+    def writeChunk(self, entity, using, insertedEntities, number, batchSize=None, firstPk=None):
+        pks = insertedEntities[entity.model]
+        if batchSize:
+            for start in range(0, number, batchSize):
+                batchPks = entity.executeBatch(using, insertedEntities, min(batchSize, number - start),
+                                               None if firstPk is None else firstPk + start)
+                pks.extend(batchPks)
+                entity.executeManyToMany(using, batchPks, insertedEntities, batchSize)
+            return
+        chunkPks = []
+        for i in range(0,number):
+            chunkPks.append( entity.execute(using, insertedEntities) )
+            pks.append(chunkPks[-1])
+        entity.executeManyToMany(using, chunkPks, insertedEntities)
+
+    def export(self, stream, format='csv', chunkSize=1000, firstPk=1):
+        """
+        Write the rows of all the Entity classes previously added to a stream
+        instead of the database, see django_faker.exporters.export
+
+        :param stream: file-like object, or dict with model as key and file-like object as value
+        :param format: one of 'csv', 'jsonl' or 'copy'
+        :rtype: dict with model as key and the InsertedPks of its exported rows as value
+        """
+        from django_faker.exporters import export
+        return export(self, stream, format, chunkSize, firstPk)
+
     def getConnection(self):
         """
         use the first connection available
@@ -175,7 +1608,7 @@ class Populator(object):
             raise AttributeError('No class found from entities. Did you add entities to the Populator ?')
         klass = list(klass)[0]
 
-        return klass.objects._db
+        return klass._default_manager._db or router.db_for_write(klass)
 
 
 
@@ -0,0 +1,132 @@
+"""
+Opt-in profiling of a Populator.
+
+A Profiler records, for every populated model, the calls and the time of
+each field formatter, the number of queries and their time, the rows and
+the total time. Without a Profiler the formatters are not wrapped and the
+queries are not captured, so the populator does not pay for it.
+
+uses:
+
+    from django_faker.profiling import Profiler
+
+    profiler = Profiler()
+    populator = Populator(generator, profiler=profiler)
+    populator.addEntity(Game, 1000)
+    populator.execute()
+    print profiler.report()
+
+The stats of each model are also passed to the optional callback of the
+Profiler and sent with the django_faker.signals.entity_populated signal.
+Queries are counted through the Django debug query log, so queries sent
+directly to the database cursor (e.g. the COPY loader) are not included.
+"""
+import time
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from django_faker.populator import modelLabel
+from django_faker.signals import entity_populated
+
+timer = getattr(time, 'perf_counter', time.time)
+
+
+class Profiler(object):
+
+    def __init__(self, callback=None):
+        """
+        :param callback: optional callable, called with model and stats after each entity
+        """
+        self.callback = callback
+        self.entities = {}
+
+    def stats(self, model):
+        """
+        Stats of a model: rows, time, queries, dbTime and, for each field,
+        the calls and the time of its formatter
+        """
+        stats = self.entities.get(model)
+        if stats is None:
+            stats = self.entities[model] = {'rows': 0, 'time': 0.0, 'queries': 0, 'dbTime': 0.0, 'fields': {}}
+        return stats
+
+    def fieldStats(self, model, field):
+        fields = self.stats(model)['fields']
+        if field not in fields:
+            fields[field] = {'calls': 0, 'time': 0.0}
+        return fields[field]
+
+    def wrap(self, model, field, format):
+        """
+        Timed version of a field formatter
+        """
+        stats = self.fieldStats(model, field)
+
+        def timed(insertedEntities):
+            start = timer()
+            try:
+                return format(insertedEntities)
+            finally:
+                stats['calls'] += 1
+                stats['time'] += timer() - start
+        return timed
+
+    def wrapColumn(self, model, field, format):
+        """
+        Timed version of a column formatter, every value counts as a call
+        """
+        stats = self.fieldStats(model, field)
+
+        def timed(rng, number):
+            start = timer()
+            try:
+                return format(rng, number)
+            finally:
+                stats['calls'] += number
+                stats['time'] += timer() - start
+        return timed
+
+    @contextmanager
+    def profileEntity(self, model, pks):
+        """
+        Time the population of a model, `pks` are its InsertedPks
+        """
+        stats = self.stats(model)
+        done = len(pks)
+        start = timer()
+        try:
+            yield stats
+        finally:
+            stats['time'] += timer() - start
+            stats['rows'] += len(pks) - done
+
+        if self.callback:
+            self.callback(model, stats)
+        entity_populated.send(sender=model, stats=stats)
+
+    @contextmanager
+    def profileQueries(self, model, using):
+        """
+        Count the queries sent for a model, and their time
+        """
+        stats = self.stats(model)
+        with CaptureQueriesContext(connections[using]) as queries:
+            yield
+        stats['queries'] += len(queries)
+        stats['dbTime'] += sum([float(query['time']) for query in queries.captured_queries])
+
+    def report(self):
+        """
+        Stats of all the models, indexed by "app_label.ModelName"
+
+        :rtype: dict
+        """
+        report = {}
+        for model, stats in self.entities.items():
+            entry = dict(stats)
+            entry['fields'] = dict([(field, dict(fieldStats)) for field, fieldStats in stats['fields'].items()])
+            entry['formatTime'] = sum([fieldStats['time'] for fieldStats in stats['fields'].values()])
+            report[modelLabel(model)] = entry
+        return report
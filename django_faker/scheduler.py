@@ -0,0 +1,163 @@
+"""
+Order the entities of a Populator by their relations.
+
+An entity depends on the models its ForeignKey, OneToOneField and
+ManyToManyField formatters relate to, when they are entities of the same
+Populator. The entities are sorted topologically, keeping the addEntity
+order between independent entities, so a model is populated after the
+models it relates to whatever the order of the addEntity calls. Relations
+in a cycle are resolved in addEntity order.
+
+With `threads` the entities that do not depend on each other are populated
+at the same time, each one in a thread with its own database connection:
+
+    pop.addEntity(Player, 100000)
+    pop.addEntity(Game, 1000)
+    pop.addEntity(Article, 100000)
+    pop.execute(batchSize=1000, threads=2)  # Game and Article, then Player
+
+The threads share the generator, whose random state is global to the
+process, so seeded and checkpointed runs are not threaded.
+
+"""
+import threading
+from itertools import chain
+
+from django.db import connections
+from django.utils.six.moves import queue
+
+from django_faker.populator import RelationFormatter
+
+
+def entityDependencies(entity):
+    """
+    The models related by the formatters of a ModelPopulator, but its own
+
+    :rtype: set
+    """
+    models = set()
+    for format in chain(entity.fieldFormatters.values(), entity.manyToManyFormatters.values()):
+        if isinstance(format, RelationFormatter) and format.relatedModel is not entity.model:
+            models.add(format.relatedModel)
+    return models
+
+
+class EntityScheduler(object):
+
+    def __init__(self, populator, threads=None):
+        """
+        :param populator: Populator
+        :param threads: optional int, the number of entities populated at the same time
+        :type threads: integer or None
+        """
+        self.populator = populator
+        self.threads = threads or 1
+
+    def dependencies(self):
+        """
+        The indexes of the populator orders each order waits for, the orders
+        of its related models and the previous orders of the same model
+
+        :rtype: dict with order index as key and a set of indexes as value
+        """
+        orders = self.populator.orders
+        dependencies = {}
+        for index, klass in enumerate(orders):
+            models = entityDependencies(self.populator.entities[klass])
+            dependencies[index] = set([other for other, model in enumerate(orders)
+                                       if model in models or (model is klass and other < index)])
+        return dependencies
+
+    def ready(self, pending, done, dependencies):
+        """
+        The pending indexes with all their dependencies done, in addEntity order
+        """
+        return [index for index in sorted(pending) if dependencies[index] <= done]
+
+    def sortedIndexes(self):
+        dependencies = self.dependencies()
+        pending = set(dependencies)
+        done = set()
+        indexes = []
+        while pending:
+            ready = self.ready(pending, done, dependencies)
+            # the first order of a cycle
+            index = ready[0] if ready else min(pending)
+            pending.remove(index)
+            done.add(index)
+            indexes.append(index)
+        return indexes
+
+    def order(self):
+        """
+        The models in the order they are populated by a serial run
+
+        :rtype: list
+        """
+        return [self.populator.orders[index] for index in self.sortedIndexes()]
+
+    def execute(self, populate, using):
+        """
+        Call populate(model) for each order of the populator, as soon as the
+        orders it depends on are done
+
+        :param populate: callable populating a model
+        :param using: str The connection name, closed at the end of each thread
+        :raises: the first error raised by populate, after the running ones are done
+        """
+        if self.threads <= 1:
+            for klass in self.order():
+                populate(klass)
+            return
+
+        orders = self.populator.orders
+        dependencies = self.dependencies()
+        pending = set(dependencies)
+        done = set()
+        running = set()
+        threads = []
+        errors = []
+        # (index, error or None) of the finished threads
+        finished = queue.Queue()
+
+        try:
+            while pending or running:
+                if not errors:
+                    ready = self.ready(pending, done, dependencies)
+                    if not ready and not running:
+                        ready = [min(pending)]
+                    for index in ready[:self.threads - len(running)]:
+                        pending.remove(index)
+                        running.add(index)
+                        thread = threading.Thread(target=self.run, args=(populate, orders[index], using, index,
+                                                                         finished))
+                        thread.start()
+                        threads.append(thread)
+                if not running:
+                    break
+                index, error = finished.get()
+                running.remove(index)
+                if error is not None:
+                    errors.append(error)
+                else:
+                    done.add(index)
+        finally:
+            for thread in threads:
+                thread.join()
+
+        if errors:
+            raise errors[0]
+
+    def run(self, populate, klass, using, index, finished):
+        """
+        Populate a model in a thread, with the database connection of the thread
+        """
+        try:
+            try:
+                populate(klass)
+            finally:
+                connections[using].close()
+        except BaseException as e:
+            finished.put((index, e))
+        else:
+            finished.put((index, None))
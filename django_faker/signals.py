@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# sent after an entity is populated by a Populator with a Profiler,
+# arguments: sender (the model class) and stats (see Profiler.stats)
+entity_populated = Signal()
@@ -1,3 +1,4 @@
+import hashlib
 from inspect import getargspec
 from django import template
 from django.template.base import TagHelperNode, TemplateSyntaxError, parse_bits
@@ -5,6 +6,7 @@ from django.template.base import TagHelperNode, TemplateSyntaxError, parse_bits
 register = template.Library()
 
 from django_faker import Faker
+from django_faker.utils import deriveSeed
 
 def optional_assignment_tag(func=None, takes_context=None, name=None):
     """
@@ -122,6 +124,86 @@ def do_or_fake_filter( value, formatter ):
     return value
 
 
+class FakeBlockNode(template.Node):
+    """
+    Render the block with the generator seeded, and cache the output.
+
+    The generator is reseeded from the system entropy after the block, so the
+    fakes after it are not seeded and the random state of the other threads
+    is not rewound. No lock is taken: the random state of the generators is
+    global to the process, fakes of other threads while a block renders for
+    the first time change its output.
+    """
+
+    def __init__(self, nodelist, name, seed=None, timeout=None):
+        self.nodelist = nodelist
+        self.name = name
+        self.seed = seed
+        self.timeout = timeout
+
+    @staticmethod
+    def cacheKey(name, codename, seed):
+        key = '%s:%s:%s' % (name, codename, seed)
+        return 'django_faker.fakeblock.%s' % hashlib.md5(key.encode('utf-8')).hexdigest()
+
+    def render(self, context):
+        from django.core.cache import cache
+
+        seed = self.seed.resolve(context) if self.seed else None
+        if seed is None:
+            seed = Faker.getSeed('fakeblock', self.name)
+        if seed is None:
+            seed = deriveSeed('fakeblock', self.name)
+
+        key = self.cacheKey(self.name, Faker.getDefaultCodename(), seed)
+        output = cache.get(key)
+        if output is not None:
+            return output
+
+        generator = Faker.getGenerator()
+        generator.seed(seed)
+        try:
+            output = self.nodelist.render(context)
+        finally:
+            # the fakes after the block are not seeded
+            generator.seed()
+
+        if self.timeout:
+            cache.set(key, output, int(self.timeout.resolve(context)))
+        else:
+            cache.set(key, output)
+        return output
+
+
+@register.tag(name='fakeblock')
+def do_fakeblock( parser, token ):
+    """
+    render a block with the fakes seeded, and cache the output
+    uses:
+
+        {% fakeblock 'contacts' seed=42 timeout=3600 %}
+            {% for i in 100|get_range %}{% fake 'name' %}{% endfor %}
+        {% endfakeblock %}
+
+    the output is cached by name, seed and locale of the generator, the
+    seed defaults to one derived from settings.FAKER_SEED and the name
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise TemplateSyntaxError("'%s' tag requires a fragment name" % bits[0])
+    name = bits[1].strip('\'"')
+    options = {}
+    for bit in bits[2:]:
+        option, sep, value = bit.partition('=')
+        if not sep or option not in ('seed', 'timeout'):
+            raise TemplateSyntaxError("'%s' tag accepts only seed=... and timeout=... after the name" % bits[0])
+        options[option] = parser.compile_filter(value)
+
+    nodelist = parser.parse(('endfakeblock',))
+    parser.delete_first_token()
+    return FakeBlockNode(nodelist, name, options.get('seed'), options.get('timeout'))
+
+
 @register.filter
 def get_range( value ):
     """
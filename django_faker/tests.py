@@ -1,12 +1,43 @@
+import datetime
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
 from faker import Faker
-from django_faker.populator import Populator
+from django_faker.checkpoint import Checkpoint, CheckpointError, dumpPks, loadPks
+from django_faker import loaders
+from django_faker.guessers import Name
+from django_faker.populator import (
+    FieldTypeGuesser, InsertedPks, ModelPopulator, Populator, PopulationError, RelationFormatter, UniqueValues,
+    suffixed,
+)
+from django_faker.parallel import ParallelExecutor
+from django_faker.profiling import Profiler
+from django_faker.scheduler import EntityScheduler
+from django_faker.signals import entity_populated
+from django_faker.utils import LRUCache, UniqueSet, deriveSeed
 from django_faker import Faker as DjangoFaker
 
-from django.db import models
+from django.conf import settings
+from django.db import connection, models
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.utils import unittest
+from django.utils.six import StringIO
 from django.template import Context, TemplateSyntaxError
 from django.template import Template
 
+try:
+    import asgiref
+except ImportError:
+    asgiref = None
+
 fake = Faker()
 
 class Game(models.Model):
@@ -50,6 +81,59 @@ class Action(models.Model):
     target= models.ForeignKey(Player, related_name='enemy_actions+', null=True)
 
 
+class Team(models.Model):
+
+    name= models.CharField(max_length=100)
+
+    players= models.ManyToManyField(Player, related_name='teams')
+    rivals= models.ManyToManyField('self')
+
+
+class Account(models.Model):
+
+    REGIONS = (
+        ('n', 'North'),
+        ('s', 'South'),
+    )
+
+    username= models.CharField(max_length=6, unique=True)
+    email= models.EmailField(unique=True)
+    code= models.CharField(max_length=2)
+    region= models.CharField(max_length=1, choices=REGIONS)
+
+    class Meta:
+        unique_together = ('code', 'region')
+
+
+class Login(models.Model):
+
+    logged_at= models.DateTimeField()
+
+    account= models.ForeignKey(Account, to_field='username')
+
+
+class Profile(models.Model):
+
+    bio= models.TextField()
+
+    player= models.OneToOneField(Player)
+
+
+class Tournament(models.Model):
+
+    name= models.CharField(max_length=100)
+
+    people= models.Manager()
+
+
+class Document(models.Model):
+
+    name= models.CharField(max_length=100)
+    body= models.TextField(null=True)
+    data= models.BinaryField()
+    created_at= models.DateTimeField()
+
+
 class PopulatorTestCase(unittest.TestCase):
 
     def testPopulation(self):
@@ -75,6 +159,63 @@ class PopulatorTestCase(unittest.TestCase):
         } )
         self.assertEqual(len(populator.execute()[Game]), title_fake.count)
 
+    def testGuesserRegistry(self):
+
+        class ScoreField(models.IntegerField):
+            pass
+
+        guesser = FieldTypeGuesser(fake)
+        self.assertIsNotNone(guesser.guessBatchFormat(ScoreField()))
+        self.assertIsNone(guesser.guessBatchFormat(models.SlugField()))
+
+        FieldTypeGuesser.register(ScoreField, lambda generator, field: lambda x: 42)
+        try:
+            self.assertEqual(guesser.guessFormat(ScoreField())(None), 42)
+            self.assertIsNone(guesser.guessBatchFormat(ScoreField()))
+            self.assertTrue(0 <= guesser.guessFormat(models.IntegerField())(None) <= 2147483647)
+        finally:
+            del FieldTypeGuesser.formatters[ScoreField]
+            del FieldTypeGuesser.batchFormatters[ScoreField]
+            FieldTypeGuesser.dispatchCache.clear()
+
+        nameGuesser = Name(fake)
+        self.assertIsNone(nameGuesser.guessFormat('motto'))
+        Name.register('Motto', 'catchPhrase')
+        try:
+            self.assertTrue(nameGuesser.guessFormat('motto')(None))
+        finally:
+            del Name.formatters['motto']
+        self.assertIn(nameGuesser.guessFormat('is_active')(None), (True, False))
+
+    def testFormatterCache(self):
+
+        populator = Populator(fake, codename='test')
+        populator.addEntity(Player, 1)
+        first = populator.entities[Player].fieldFormatters
+        populator.addEntity(Player, 1, {'score': lambda x: 1})
+        second = populator.entities[Player].fieldFormatters
+
+        self.assertIs(first['nickname'], second['nickname'])
+        self.assertIsNot(first['score'], second['score'])
+        self.assertIsNot(first['game'], second['game'])
+
+        populator.addEntity(Player, 1)
+        self.assertIs(populator.entities[Player].fieldFormatters['score'], first['score'])
+
+        Populator(Faker()).addEntity(Player, 1)
+        self.assertIs(populator.entities[Player].getFieldFormatters(fake, 'test')['score'], first['score'])
+
+        class ScorePopulator(ModelPopulator):
+            def guessFieldFormatters(self, generator):
+                formatters = super(ScorePopulator, self).guessFieldFormatters(generator)
+                formatters['score'] = lambda x: 7
+                return formatters
+
+        populator.addEntity(ScorePopulator(Player), 1)
+        self.assertEqual(populator.entities[Player].fieldFormatters['score'](None), 7)
+        populator.addEntity(Player, 1)
+        self.assertIs(populator.entities[Player].fieldFormatters['score'], first['score'])
+
     def testFormatter(self):
 
         generator = fake
@@ -95,6 +236,867 @@ class PopulatorTestCase(unittest.TestCase):
 
         self.assertTrue( any([0 <= p.score <= 1000 and '@' in p.nickname for p in Player.objects.all() ]) )
 
+    def testRowFactory(self):
+
+        populator = Populator(fake)
+        populator.addEntity(Game, 1, {
+            'title': 'Constant title',
+            'max_score': lambda x: 42,
+            'description': None,
+        })
+        populator.addEntity(Player, 1)
+        entity = populator.entities[Game]
+
+        row = entity.rowFactory({})
+        self.assertEqual(row['title'], 'Constant title')
+        self.assertEqual(row['max_score'], 42)
+        self.assertNotIn('description', row)
+        self.assertNotIn('id', row)
+
+        row = populator.entities[Player].rowFactory({Game: [7]})
+        self.assertEqual(row['game_id'], 7)
+        self.assertNotIn('game', row)
+
+    def testVectorizedColumns(self):
+
+        populator = Populator(fake)
+        populator.addEntity(Game, 20, {'max_score': lambda x: 10}, vectorize=True)
+        entity = populator.entities[Game]
+
+        # created_at is guessed by name, max_score is custom
+        self.assertEqual(sorted(entity.batchFormatters.keys()), ['active', 'updated_date', 'updated_time'])
+
+        rows = entity.buildRows({}, 20)
+        self.assertEqual(len(rows), 20)
+        self.assertTrue(all([row['active'] in (True, False) and row['max_score'] == 10 for row in rows]))
+        self.assertTrue(all([isinstance(row['updated_date'], datetime.date) for row in rows]))
+
+        insertedPks = populator.execute(batchSize=8)
+        self.assertEqual(Game.objects.filter(pk__in=insertedPks[Game], max_score=10).count(), 20)
+
+    def testIntegerColumnsFitSignedTypes(self):
+
+        guesser = FieldTypeGuesser(fake)
+        rng = random.Random(1)
+        for field, bits in ((models.SmallIntegerField(), 15), (models.IntegerField(), 31),
+                            (models.BigIntegerField(), 63)):
+            values = guesser.guessBatchFormat(field)(rng, 1000)
+            self.assertTrue(all([0 <= value < 2 ** bits for value in values]))
+            format = guesser.guessFormat(field)
+            self.assertTrue(all([0 <= format(None) < 2 ** bits for i in range(0, 1000)]))
+
+    def testDecimalsFitField(self):
+
+        field = models.DecimalField(max_digits=4, decimal_places=2)
+        format = FieldTypeGuesser(fake).guessFormat(field)
+        for value in [format(None) for i in range(0, 200)]:
+            self.assertTrue(-100 < value < 100)
+            self.assertEqual(field.clean(value, None), value)
+
+    def testPooledFormatters(self):
+
+        def title_fake(arg):
+            title_fake.count += 1
+            return 'title %d' % title_fake.count
+        title_fake.count = 0
+
+        populator = Populator(fake)
+        populator.addEntity(Game, 30, {'title': title_fake}, poolSizes={'title': 3})
+        insertedPks = populator.execute()
+
+        self.assertEqual(title_fake.count, 3)
+        titles = Game.objects.filter(pk__in=insertedPks[Game]).values_list('title', flat=True)
+        self.assertEqual(sorted(set(titles)), ['title 1', 'title 2', 'title 3'])
+
+    def testPooledTextFields(self):
+
+        populator = Populator(fake)
+        populator.addEntity(Game, 1, poolSizes=5)
+        formatters = populator.entities[Game].fieldFormatters
+
+        self.assertEqual(formatters['title'].size, 5)
+        self.assertEqual(formatters['description'].size, 5)
+        self.assertFalse(hasattr(formatters['max_score'], 'size'))
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'COPY is supported only by PostgreSQL')
+    def testCopyPopulation(self):
+
+        populator = Populator(fake)
+        populator.addEntity(Game, 5)
+        populator.addEntity(Player, 20)
+
+        insertedPks = populator.execute(batchSize=8)
+
+        self.assertEqual(Game.objects.filter(pk__in=insertedPks[Game]).count(), 5)
+        players = Player.objects.filter(pk__in=insertedPks[Player])
+        self.assertEqual(players.count(), 20)
+        self.assertTrue(all([p.game_id in insertedPks[Game] for p in players]))
+
+        # PKs were taken from the sequence
+        self.assertTrue(Game.objects.create(
+            title='t', slug='t', description='d', created_at=datetime.datetime.now(),
+            updated_date=datetime.date.today(), updated_time=datetime.time(), active=True, max_score=0,
+        ).pk > max(insertedPks[Game]))
+
+    def testManyToMany(self):
+
+        populator = Populator(fake)
+        populator.addEntity(Game, 2)
+        populator.addEntity(Player, 10)
+        populator.addEntity(Team, 6, edgesPerRow={'players': (2, 4)})
+        insertedPks = populator.execute(batchSize=4)
+
+        teams = Team.objects.filter(pk__in=insertedPks[Team])
+        for team in teams:
+            players = list(team.players.values_list('pk', flat=True))
+            self.assertTrue(2 <= len(players) <= 4)
+            self.assertTrue(all([pk in insertedPks[Player] for pk in players]))
+        self.assertEqual(Team.rivals.through.objects.filter(from_team__in=insertedPks[Team]).count(), 0)
+
+    def testSymmetricalManyToMany(self):
+
+        populator = Populator(fake)
+        populator.addEntity(Team, 8, edgesPerRow=3)
+        insertedPks = populator.execute()
+
+        for team in Team.objects.filter(pk__in=insertedPks[Team]):
+            for rival in team.rivals.all():
+                self.assertIn(team, rival.rivals.all())
+
+    def testBulkPopulation(self):
+
+        populator = Populator(fake)
+        populator.addEntity(Game, 5)
+        populator.addEntity(Player, 11)
+
+        insertedPks = populator.execute(batchSize=4)
+
+        self.assertEqual(len(insertedPks[Game]), 5)
+        self.assertEqual(len(insertedPks[Player]), 11)
+        self.assertEqual(Game.objects.filter(pk__in=insertedPks[Game]).count(), 5)
+        players = Player.objects.filter(pk__in=insertedPks[Player])
+        self.assertEqual(players.count(), 11)
+        self.assertTrue(all([p.game_id in insertedPks[Game] for p in players]))
+
+        # the sequence must follow the explicitly assigned PKs
+        game = Game.objects.get(pk=insertedPks[Game][0])
+        game.pk = None
+        game.save()
+        self.assertTrue(game.pk > max(insertedPks[Game]))
+
+    def testBatchWithoutConnection(self):
+
+        populator = Populator(fake)
+        populator.addEntity(Game, 3)
+        entity = populator.entities[Game]
+        entity.prepare(None)
+
+        pks = entity.executeBatch(None, {}, 3)
+        entity.resetSequence(None)
+        self.assertEqual(Game.objects.filter(pk__in=pks).count(), 3)
+
+    def testRenamedManager(self):
+
+        populator = Populator(fake)
+        populator.addEntity(Tournament, 4)
+        insertedPks = populator.execute(batchSize=2)
+        self.assertEqual(Tournament.people.filter(pk__in=insertedPks[Tournament]).count(), 4)
+
+
+    def testRelationsDoNotQueryPerRow(self):
+
+        populator = Populator(fake)
+        populator.addEntity(Game, 2)
+        populator.addEntity(Player, 10)
+
+        with CaptureQueriesContext(connection) as queries:
+            insertedPks = populator.execute()
+
+        # one INSERT per row and no SELECT, relations are taken from the
+        # inserted PKs; the transaction statements logged by some backends
+        # are not counted
+        statements = [query['sql'].upper() for query in queries.captured_queries]
+        self.assertEqual(len([sql for sql in statements if 'INSERT INTO ' in sql]), 12)
+        self.assertFalse([sql for sql in statements if 'SELECT ' in sql])
+        for player in Player.objects.filter(pk__in=insertedPks[Player]):
+            self.assertIn(player.game_id, insertedPks[Game])
+
+    def testRelationsWithExistingRows(self):
+
+        populator = Populator(fake)
+        populator.addEntity(Game, 3)
+        populator.execute()
+
+        populator = Populator(fake)
+        populator.addEntity(Player, 10)
+        insertedPks = populator.execute()
+
+        players = Player.objects.filter(pk__in=insertedPks[Player])
+        self.assertEqual(players.count(), 10)
+        self.assertTrue(all([Game.objects.filter(pk=p.game_id).exists() for p in players]))
+
+    def testRelationSample(self):
+
+        populator = Populator(fake)
+        populator.addEntity(Game, 50)
+        populator.execute()
+
+        format = RelationFormatter(Player._meta.get_field('game'))
+        format.sampleSize = 10
+        format.prepare(None)
+        sample = format.relatedPks({})
+
+        self.assertEqual(len(set(sample)), 10)
+        self.assertEqual(Game.objects.filter(pk__in=sample).count(), 10)
+        # not the oldest rows of the table
+        oldest = list(Game.objects.order_by('pk').values_list('pk', flat=True)[:10])
+        self.assertNotEqual(sorted(sample), oldest)
+
+    def testRelationToField(self):
+
+        populator = Populator(fake)
+        populator.addEntity(Account, 5)
+        populator.addEntity(Login, 10)
+        insertedPks = populator.execute()
+
+        usernames = set(Account.objects.filter(pk__in=insertedPks[Account]).values_list('username', flat=True))
+        for login in Login.objects.filter(pk__in=insertedPks[Login]):
+            self.assertIn(login.account_id, usernames)
+
+
+    def testAtomicChunksRollbackOnlyFailedChunk(self):
+
+        def score_fake(arg):
+            score_fake.count += 1
+            if score_fake.count > 7:
+                raise ValueError('boom')
+            return fake.randomInt(0, 1000)
+        score_fake.count = 0
+
+        populator = Populator(fake)
+        populator.addEntity(Game, 1)
+        populator.addEntity(Player, 10, {'score': score_fake})
+
+        with self.assertRaises(PopulationError) as cm:
+            populator.execute(atomic=True, chunkSize=3)
+
+        error = cm.exception
+        self.assertIs(error.model, Player)
+        self.assertEqual(error.done, 6)
+        self.assertEqual(len(error.insertedEntities[Player]), 6)
+        self.assertEqual(Player.objects.filter(pk__in=error.insertedEntities[Player]).count(), 6)
+
+    def testErrorsOfPlainRunsAreNotWrapped(self):
+
+        class ScoreError(Exception):
+            pass
+
+        def score_fake(arg):
+            raise ScoreError()
+
+        populator = Populator(fake)
+        populator.addEntity(Game, 1)
+        populator.addEntity(Player, 3, {'score': score_fake})
+
+        with self.assertRaises(ScoreError):
+            populator.execute()
+
+
+class UniqueTestCase(unittest.TestCase):
+
+    def setUp(self):
+        Account.objects.all().delete()
+
+    def populator(self, number, codes):
+        # the codes are taken in turn, the repeated ones are known in advance
+        codes = itertools.cycle(codes)
+        populator = Populator(fake)
+        populator.addEntity(Account, number, {
+            'username': lambda x: 'same',
+            'email': lambda x: 'same@example.com',
+            'code': lambda x: next(codes),
+            'region': lambda x: 'n',
+        })
+        return populator
+
+    def testUniqueFields(self):
+
+        codes = ['%02d' % i for i in range(0, 15)]
+        self.populator(12, codes[:12]).execute(batchSize=5)
+        self.populator(3, codes[12:]).execute()
+
+        usernames = list(Account.objects.values_list('username', flat=True))
+        self.assertEqual(len(usernames), 15)
+        self.assertEqual(len(set(usernames)), 15)
+        self.assertTrue(all([len(username) <= 6 for username in usernames]))
+        self.assertIn('same-1@example.com', Account.objects.values_list('email', flat=True))
+
+    def testUniqueTogether(self):
+
+        # every other code is repeated and generated again
+        self.populator(3, 'aabbcc').execute()
+        self.populator(2, 'ddeeff').execute(batchSize=2)
+        self.assertEqual(sorted(Account.objects.values_list('code', flat=True)), ['a', 'b', 'c', 'd', 'e'])
+
+        # the combinations in the table are not repeated
+        with self.assertRaises(PopulationError):
+            self.populator(1, 'abc').execute(atomic=True)
+
+    def testScanLimit(self):
+
+        self.populator(4, 'abcd').execute()
+        entity = ModelPopulator(Account)
+        entity.uniqueFormatters()
+        scanLimit = UniqueValues.scanLimit
+        UniqueValues.scanLimit = 2
+        try:
+            entity.prepare('default')
+        finally:
+            UniqueValues.scanLimit = scanLimit
+
+        # only the values of the most recent rows are loaded
+        seen = entity.uniqueTogether[0].seen
+        self.assertEqual([code in seen for code in [('a', 'n'), ('b', 'n'), ('c', 'n'), ('d', 'n')]],
+                         [False, False, True, True])
+
+    def testOneToOne(self):
+
+        populator = Populator(fake)
+        populator.addEntity(Player, 6)
+        populator.addEntity(Profile, 6)
+        insertedPks = populator.execute(batchSize=4)
+        players = list(Profile.objects.filter(pk__in=insertedPks[Profile]).values_list('player_id', flat=True))
+        self.assertEqual(sorted(players), sorted(insertedPks[Player]))
+
+        # the players of the table, without a profile
+        populator = Populator(fake)
+        populator.addEntity(Profile, 4)
+        populator.execute()
+        players = list(Profile.objects.values_list('player_id', flat=True))
+        self.assertEqual(len(players), len(set(players)))
+
+        populator = Populator(fake)
+        populator.addEntity(Player, 2)
+        populator.addEntity(Profile, 3)
+        with self.assertRaises(ValueError):
+            populator.execute()
+
+    def testSuffixed(self):
+
+        self.assertEqual(suffixed('name', 3), 'name-3')
+        self.assertEqual(suffixed('name', 12, 6), 'nam-12')
+        self.assertEqual(suffixed('user@example.com', 2), 'user-2@example.com')
+
+    def testUniqueSet(self):
+
+        values = UniqueSet(capacity=10)
+        values.exactSize = 5
+        for i in range(0, 50):
+            values.add('value%d' % i)
+        self.assertIsNone(values.values)
+        self.assertTrue(all(['value%d' % i in values for i in range(0, 50)]))
+        self.assertEqual(len(values), 50)
+
+
+class EntitySchedulerTestCase(unittest.TestCase):
+
+    def testOrder(self):
+
+        populator = Populator(fake)
+        populator.addEntity(Action, 2)
+        populator.addEntity(Team, 2)
+        populator.addEntity(Player, 5)
+        populator.addEntity(Game, 2)
+
+        self.assertEqual(EntityScheduler(populator).order(), [Game, Player, Action, Team])
+
+        insertedPks = populator.execute()
+        self.assertEqual(len(insertedPks[Action]), 2)
+        self.assertTrue(all([action.actor_id in insertedPks[Player]
+                             for action in Action.objects.filter(pk__in=insertedPks[Action])]))
+
+    def testCustomFormatterRemovesDependency(self):
+
+        populator = Populator(fake)
+        populator.addEntity(Player, 5, {'game': lambda x: None})
+        populator.addEntity(Game, 2)
+
+        self.assertEqual(EntityScheduler(populator).order(), [Player, Game])
+
+    @unittest.skipUnless('parallel' in settings.DATABASES, 'requires the file-backed "parallel" database')
+    def testThreads(self):
+
+        # an in-memory sqlite database is not shared by the connections of the threads
+        populator = Populator(fake)
+        populator.addEntity(Action, 10)
+        populator.addEntity(Player, 10)
+        populator.addEntity(Game, 5)
+        populator.addEntity(Team, 5)
+        insertedPks = populator.execute(using='parallel', batchSize=5, threads=2)
+
+        self.assertEqual(Action.objects.using('parallel').filter(pk__in=list(insertedPks[Action])).count(), 10)
+        self.assertEqual(Player.objects.using('parallel').filter(pk__in=list(insertedPks[Player])).count(), 10)
+        self.assertEqual(Team.objects.using('parallel').filter(pk__in=list(insertedPks[Team])).count(), 5)
+
+        populator = Populator(fake, seed=3)
+        populator.addEntity(Game, 5)
+        with self.assertRaises(ValueError):
+            populator.execute(batchSize=5, threads=2)
+
+
+class InsertedPksTestCase(unittest.TestCase):
+
+    def testSequence(self):
+
+        values = [1, 2, 3, 4, 10, 12, 13, 14, 15, 'a', 20]
+        pks = InsertedPks(values)
+
+        self.assertEqual(len(pks), len(values))
+        self.assertEqual(pks, values)
+        self.assertEqual([pks[i] for i in range(len(values))], values)
+        self.assertEqual(pks[-1], 20)
+        self.assertIn(13, pks)
+        self.assertNotIn(11, pks)
+        self.assertIn(pks.choice(), values)
+        self.assertEqual(len(set(pks.sample(5))), 5)
+
+        del pks[6:]
+        self.assertEqual(pks, values[:6])
+
+    def testRanges(self):
+
+        pks = InsertedPks()
+        pks.extend(range(1, 100001))
+        pks.append(100001)
+
+        self.assertEqual(len(pks.segments), 1)
+        self.assertEqual(len(pks), 100001)
+        self.assertEqual(pks[54321], 54322)
+
+    def testReservoir(self):
+
+        pks = InsertedPks(range(1000), reservoirSize=10)
+
+        self.assertEqual(len(pks), 1000)
+        self.assertEqual(len(list(pks)), 10)
+        self.assertTrue(all([0 <= pk < 1000 for pk in pks]))
+        self.assertIn(pks.choice(), list(pks))
+
+        del pks[100:]
+        self.assertEqual(len(pks), 100)
+        self.assertTrue(all([pk < 100 for pk in pks]))
+
+
+class CheckpointTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'populate.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testDumpPks(self):
+
+        pks = InsertedPks([1, 2, 3, 4, 9, 11, 'a'])
+        self.assertEqual(loadPks(json.loads(json.dumps(dumpPks(pks))), InsertedPks()), pks)
+
+        pks = InsertedPks(range(1, 100), reservoirSize=10)
+        restored = loadPks(dumpPks(pks), InsertedPks(reservoirSize=10))
+        self.assertEqual(len(restored), 99)
+        self.assertEqual(restored, pks)
+
+    def testResume(self):
+
+        def score_fake(arg):
+            score_fake.count += 1
+            if score_fake.fail and score_fake.count > 7:
+                raise ValueError('boom')
+            return fake.randomInt(0, 1000)
+        score_fake.count = 0
+        score_fake.fail = True
+
+        populator = Populator(fake)
+        populator.addEntity(Game, 2)
+        populator.addEntity(Player, 10, {'score': score_fake})
+        before = Player.objects.count()
+
+        with self.assertRaises(PopulationError):
+            populator.execute(chunkSize=3, checkpoint=self.path)
+
+        checkpoint = Checkpoint.load(self.path)
+        self.assertEqual(checkpoint.seed, populator.seed)
+        self.assertEqual(checkpoint.state(Player)['chunks'], [0, 1])
+        self.assertEqual(Player.objects.count() - before, 6)
+
+        score_fake.fail = False
+        with self.assertRaises(CheckpointError):
+            populator.execute(chunkSize=5, checkpoint=self.path, resume=True)
+
+        insertedPks = populator.execute(chunkSize=3, checkpoint=self.path, resume=True)
+        self.assertEqual(len(insertedPks[Game]), 2)
+        self.assertEqual(len(insertedPks[Player]), 10)
+        self.assertEqual(Player.objects.count() - before, 10)
+        self.assertEqual(Player.objects.filter(pk__in=insertedPks[Player]).count(), 10)
+        self.assertEqual(Checkpoint.load(self.path).state(Player)['chunks'], [0, 1, 2, 3])
+
+
+@unittest.skipUnless(sys.version_info >= (3, 5) and asgiref, 'executeAsync requires Python 3.5 and asgiref')
+class AsyncPopulatorTestCase(unittest.TestCase):
+
+    def execute(self, populator, **kwargs):
+        import asyncio
+        return asyncio.get_event_loop().run_until_complete(populator.executeAsync(**kwargs))
+
+    def testPopulation(self):
+
+        populator = Populator(fake)
+        populator.addEntity(Game, 5)
+        populator.addEntity(Player, 25)
+        populator.addEntity(Team, 4)
+        insertedPks = self.execute(populator, batchSize=10, queueSize=1)
+
+        self.assertEqual(len(insertedPks[Player]), 25)
+        players = Player.objects.filter(pk__in=insertedPks[Player])
+        self.assertEqual(players.count(), 25)
+        self.assertTrue(all([p.game_id in insertedPks[Game] for p in players]))
+        for team in Team.objects.filter(pk__in=insertedPks[Team]):
+            self.assertTrue(all([p.pk in insertedPks[Player] for p in team.players.all()]))
+
+    def testFailure(self):
+
+        def score_fake(arg):
+            score_fake.count += 1
+            if score_fake.count > 12:
+                raise ValueError('boom')
+            return fake.randomInt(0, 1000)
+        score_fake.count = 0
+
+        populator = Populator(fake)
+        populator.addEntity(Game, 1)
+        populator.addEntity(Player, 30, {'score': score_fake})
+
+        with self.assertRaises(PopulationError) as cm:
+            self.execute(populator, batchSize=5, atomic=True)
+        self.assertIs(cm.exception.model, Player)
+        self.assertEqual(cm.exception.done, 10)
+
+
+class ProfilerTestCase(unittest.TestCase):
+
+    def testReport(self):
+
+        callbacks = []
+        profiler = Profiler(callback=lambda model, stats: callbacks.append(model))
+        populator = Populator(fake, profiler=profiler)
+        populator.addEntity(Game, 5, vectorize=True)
+        populator.addEntity(Player, 10)
+        populator.execute(batchSize=4)
+
+        report = profiler.report()
+        self.assertEqual(callbacks, [Game, Player])
+        self.assertEqual(report['django_faker.Game']['rows'], 5)
+        self.assertEqual(report['django_faker.Player']['rows'], 10)
+        self.assertEqual(report['django_faker.Game']['fields']['title']['calls'], 5)
+        self.assertEqual(report['django_faker.Game']['fields']['active']['calls'], 5)
+        self.assertEqual(report['django_faker.Player']['fields']['game_id']['calls'], 10)
+        self.assertTrue(report['django_faker.Player']['queries'] >= 3)
+
+    def testSignal(self):
+
+        sent = []
+
+        def receiver(sender, stats, **kwargs):
+            sent.append((sender, stats['rows']))
+        entity_populated.connect(receiver)
+        try:
+            populator = Populator(fake, profiler=Profiler())
+            populator.addEntity(Game, 3)
+            populator.execute()
+        finally:
+            entity_populated.disconnect(receiver)
+
+        self.assertEqual(sent, [(Game, 3)])
+
+    def testDisabled(self):
+
+        populator = Populator(fake)
+        populator.addEntity(Game, 1, {'title': lambda x: 'title'})
+        populator.execute()
+
+        # the formatters are not wrapped
+        self.assertEqual(populator.entities[Game].fieldFormatters['title'](None), 'title')
+        self.assertIsNone(populator.entities[Game].profiler)
+
+
+class ParallelExecutorTestCase(unittest.TestCase):
+
+    def testSplit(self):
+
+        executor = ParallelExecutor(Populator(fake), processes=3)
+        self.assertEqual(executor.split(10), [(0, 4), (4, 4), (8, 2)])
+        self.assertEqual(executor.split(10, chunkSize=6), [(0, 6), (6, 4)])
+        self.assertEqual(executor.split(0), [])
+
+    def testInlineExecution(self):
+
+        # a single process runs the tasks in place, the in-memory test
+        # database is not shared with forked workers
+        populator = Populator(fake)
+        populator.addEntity(Game, 5)
+        populator.addEntity(Player, 12)
+
+        insertedPks = ParallelExecutor(populator, processes=1).execute(batchSize=5, chunkSize=4)
+
+        self.assertEqual(len(insertedPks[Game]), 5)
+        self.assertEqual(len(set(insertedPks[Player])), 12)
+        players = Player.objects.filter(pk__in=insertedPks[Player])
+        self.assertEqual(players.count(), 12)
+        self.assertTrue(all([p.game_id in insertedPks[Game] for p in players]))
+
+    @unittest.skipUnless('parallel' in settings.DATABASES, 'requires the file-backed "parallel" database')
+    def testWorkerProcesses(self):
+
+        populator = Populator(fake)
+        populator.addEntity(Game, 5)
+        populator.addEntity(Player, 12)
+
+        insertedPks = populator.execute(using='parallel', batchSize=3, chunkSize=4, processes=2)
+
+        self.assertEqual(len(insertedPks[Game]), 5)
+        self.assertEqual(len(set(insertedPks[Player])), 12)
+        players = Player.objects.using('parallel').filter(pk__in=list(insertedPks[Player]))
+        self.assertEqual(players.count(), 12)
+        self.assertTrue(all([p.game_id in insertedPks[Game] for p in players]))
+
+    def testWorkersRequireFork(self):
+
+        def getContext(method):
+            raise ValueError('cannot find context for %r' % method)
+
+        populator = Populator(fake)
+        populator.addEntity(Game, 5)
+        original = getattr(multiprocessing, 'get_context', None)
+        multiprocessing.get_context = getContext
+        try:
+            with self.assertRaises(PopulationError):
+                ParallelExecutor(populator, 2).execute()
+        finally:
+            if original is None:
+                del multiprocessing.get_context
+            else:
+                multiprocessing.get_context = original
+
+    @unittest.skipUnless('parallel' in settings.DATABASES, 'requires the file-backed "parallel" database')
+    def testUniqueValuesOfWorkers(self):
+
+        # each worker would suffix its repeated values from same-1
+        populator = Populator(fake)
+        populator.addEntity(Account, 12, {
+            'username': lambda x: 'same',
+            'email': lambda x: 'same@example.com',
+        })
+
+        insertedPks = populator.execute(using='parallel', batchSize=3, processes=2)
+
+        usernames = Account.objects.using('parallel').filter(pk__in=list(insertedPks[Account])).values_list(
+            'username', flat=True)
+        self.assertEqual(len(set(usernames)), 12)
+
+
+class ExportTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.populator = Populator(fake)
+        self.populator.addEntity(Game, 3)
+        self.populator.addEntity(Player, 7)
+
+    def testExportJsonLines(self):
+
+        stream = StringIO()
+        insertedPks = self.populator.export(stream, 'jsonl', chunkSize=2)
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+
+        self.assertEqual(list(insertedPks[Game]), [1, 2, 3])
+        self.assertEqual(len(lines), 10)
+        players = [line for line in lines if line['model'] == 'django_faker.player']
+        self.assertEqual([line['pk'] for line in players], list(range(1, 8)))
+        self.assertTrue(all([line['fields']['game'] in (1, 2, 3) for line in players]))
+
+    def testExportRelatedModelsFirst(self):
+
+        populator = Populator(fake)
+        populator.addEntity(Player, 7)
+        populator.addEntity(Game, 3)
+
+        stream = StringIO()
+        populator.export(stream, 'jsonl')
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+
+        self.assertEqual([line['model'] for line in lines], ['django_faker.game'] * 3 + ['django_faker.player'] * 7)
+        self.assertTrue(all([line['fields']['game'] in (1, 2, 3) for line in lines[3:]]))
+
+    def testExportCsvPerModel(self):
+
+        streams = {Game: StringIO(), Player: StringIO()}
+        self.populator.export(streams, 'csv')
+
+        rows = streams[Player].getvalue().splitlines()
+        self.assertEqual(rows[0].split(','), ['id', 'nickname', 'score', 'last_login_at', 'game_id'])
+        self.assertEqual(len(rows), 8)
+
+    def testExportCopy(self):
+
+        stream = StringIO()
+        self.populator.export(stream, 'copy')
+        lines = stream.getvalue().splitlines()
+
+        self.assertTrue(lines[0].startswith('COPY "%s" ("id", ' % Game._meta.db_table))
+        self.assertEqual(lines.count('\\.'), 2)
+        self.assertEqual(len(lines), 3 + 7 + 4)
+
+    def testExportNonAscii(self):
+
+        title = u'J\xe9r\xf4me \u2603'
+        populator = Populator(fake)
+        populator.addEntity(Game, 2, {'title': lambda x: title})
+        directory = tempfile.mkdtemp()
+        try:
+            for format in ('csv', 'copy', 'jsonl'):
+                path = os.path.join(directory, 'games.%s' % format)
+                # a byte file on Python 2 and a text file
+                for opener in (open, lambda path, mode: io.open(path, mode, encoding='utf-8')):
+                    with opener(path, 'w') as stream:
+                        populator.export(stream, format)
+                    with io.open(path, encoding='utf-8') as stream:
+                        text = stream.read()
+                    if format == 'jsonl':
+                        text = u''.join([json.loads(line)['fields']['title'] for line in text.splitlines()])
+                    self.assertEqual(text.count(title), 2)
+        finally:
+            shutil.rmtree(directory)
+
+
+class CopyCursor(object):
+    """
+    The cursor wrapper of a psycopg2 cursor, records the COPY statements
+    """
+
+    def __init__(self, copied):
+        self.cursor = self
+        self.copied = copied
+
+    def copy_expert(self, sql, stream):
+        self.copied.append((sql, stream.read()))
+
+
+class CopyConnection(object):
+    """
+    The default connection with a psycopg2 cursor
+    """
+
+    def __init__(self):
+        self.copied = []
+
+    def __getattr__(self, name):
+        return getattr(connection, name)
+
+    def cursor(self):
+        return CopyCursor(self.copied)
+
+
+class CopyTestCase(unittest.TestCase):
+
+    def testCopyStream(self):
+
+        fakeConnection = CopyConnection()
+        rows = [
+            {'name': u'tab\there', 'body': None, 'data': b'\x00\xff',
+             'created_at': datetime.datetime(2020, 1, 2, 3, 4, 5)},
+            {'name': u'back\\slash\nnew\rline', 'body': u'J\xe9r\xf4me', 'data': b'',
+             'created_at': datetime.datetime(2020, 1, 2, 3, 4, 5, 6)},
+        ]
+        connections = loaders.connections
+        loaders.connections = {'copy': fakeConnection}
+        try:
+            pks = loaders.copyRows(ModelPopulator(Document), 'copy', rows, firstPk=7)
+        finally:
+            loaders.connections = connections
+
+        self.assertEqual(pks, [7, 8])
+        sql, stream = fakeConnection.copied[0]
+        self.assertEqual(sql, 'COPY "%s" ("id", "name", "body", "data", "created_at") FROM STDIN' % (
+            Document._meta.db_table))
+        self.assertEqual(stream.splitlines(), [
+            u'7\ttab\\there\t\\N\t\\\\x00ff\t2020-01-02 03:04:05',
+            u'8\tback\\\\slash\\nnew\\rline\tJ\xe9r\xf4me\t\\\\x\t2020-01-02 03:04:05.000006',
+        ])
+
+
+class SeedTestCase(unittest.TestCase):
+
+    def export(self, seed, chunkSize=4):
+        populator = Populator(fake, seed=seed)
+        populator.addEntity(Game, 6, vectorize=True)
+        populator.addEntity(Player, 10, poolSizes=3)
+        populator.addEntity(Team, 5)
+        stream = StringIO()
+        populator.export(stream, 'jsonl', chunkSize=chunkSize)
+        return stream.getvalue()
+
+    def testReproducibleRows(self):
+
+        self.assertEqual(self.export(42), self.export(42))
+        self.assertNotEqual(self.export(42), self.export(43))
+
+    def testReproducibleDates(self):
+
+        # the dates of a seeded run end at a pinned time, not now
+        first = self.export(42)
+        clock = time.time
+        time.time = lambda: clock() + 400 * 86400
+        try:
+            self.assertEqual(self.export(42), first)
+        finally:
+            time.time = clock
+
+        populator = Populator(fake, seed=1, pinnedTime=86400)
+        populator.addEntity(Game, 5)
+        entity = populator.entities[Game]
+        entity.prepare(None)
+        populator.reseed(entity, 0)
+        for row in entity.buildRows({}, 5):
+            self.assertTrue(row['created_at'] <= datetime.datetime.fromtimestamp(86400))
+            self.assertTrue(row['updated_date'] <= datetime.date.fromtimestamp(86400))
+
+    def testReproducibleChunks(self):
+
+        # a chunk does not depend on the rows generated before it, nor on their pools
+        populator = Populator(fake, seed=7)
+        populator.addEntity(Game, 8, poolSizes=3)
+        entity = populator.entities[Game]
+        entity.prepare(None)
+
+        populator.reseed(entity, 1)
+        second = entity.buildRows({}, 4)
+        populator.reseed(entity, 0)
+        entity.buildRows({}, 4)
+        populator.reseed(entity, 1)
+        self.assertEqual(entity.buildRows({}, 4), second)
+
+    def testDeriveSeed(self):
+
+        self.assertEqual(deriveSeed(1, 'django_faker.Game', 0), deriveSeed(1, 'django_faker.Game', 0))
+        self.assertNotEqual(deriveSeed(1, 'django_faker.Game', 0), deriveSeed(1, 'django_faker.Game', 1))
+
+    def testSeedSetting(self):
+
+        with override_settings(FAKER_SEED=None):
+            self.assertIsNone(DjangoFaker.getSeed('default'))
+        with override_settings(FAKER_SEED=5):
+            self.assertEqual(DjangoFaker.getSeed(), 5)
+            self.assertEqual(DjangoFaker.getSeed('default'), deriveSeed(5, 'default'))
+
 
 class TemplateTagsTestCase(unittest.TestCase):
 
@@ -184,6 +1186,159 @@ class TemplateTagsTestCase(unittest.TestCase):
 </contacts>
 """))
 
+    # do_fakeblock: fakeblock
+    def testFakeBlockIsSeeded(self):
+        from django.core.cache import cache
+
+        source = "{% fakeblock names seed=seed %}{% for i in 10|get_range %}{% fake 'name' %};{% endfor %}{% endfakeblock %}"
+        cache.clear()
+        first = self.render(source, {'seed': 1})
+        cache.clear()
+        self.assertEqual(self.render(source, {'seed': 1}), first)
+        self.assertNotEqual(self.render(source, {'seed': 2}), first)
+
+    def testFakeBlockIsCached(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        source = "{% fakeblock 'value' seed=3 timeout=60 %}{{ value }}{% endfakeblock %}"
+        self.assertEqual(self.render(source, {'value': 'first'}), 'first')
+        self.assertEqual(self.render(source, {'value': 'second'}), 'first')
+        self.assertEqual(self.render(source.replace('seed=3', 'seed=4'), {'value': 'second'}), 'second')
+
+    def testFakeBlockUnseedsRandomState(self):
+        import random
+        from django.core.cache import cache
+
+        # the random state is not left seeded after the block
+        after = []
+        for i in range(0, 2):
+            cache.clear()
+            self.render("{% fakeblock names seed=6 %}{% fake 'name' %}{% endfakeblock %}")
+            after.append(random.random())
+        self.assertNotEqual(after[0], after[1])
+
+    def testFakeBlockDoesNotBlockThreads(self):
+        import threading
+        from django.core.cache import cache
+
+        faked = threading.Event()
+
+        def fake():
+            self.render("{% fake 'name' %}")
+            faked.set()
+
+        def wait():
+            # the block is rendering: another thread fakes meanwhile
+            threading.Thread(target=fake).start()
+            faked.wait(5)
+            return faked.is_set()
+
+        cache.clear()
+        output = self.render("{% fakeblock 'waiting' seed=8 %}{% fake 'name' %}{{ wait }}{% endfakeblock %}",
+                             {'wait': wait})
+        self.assertTrue(output.endswith('True'))
+
+    def testFakeBlockSyntax(self):
+        with self.assertRaises(TemplateSyntaxError):
+            self.render("{% fakeblock %}{% endfakeblock %}")
+        with self.assertRaises(TemplateSyntaxError):
+            self.render("{% fakeblock names color=1 %}{% endfakeblock %}")
+
+
+class PopulateCommandTestCase(unittest.TestCase):
+
+    def testPopulate(self):
+
+        from django.core.management import call_command
+
+        before = Player.objects.count()
+        stdout = StringIO()
+        call_command('populate', 'django_faker.Player=12', 'django_faker.Game=3', batchSize=5, seed=1, stdout=stdout)
+
+        output = stdout.getvalue()
+        self.assertEqual(Player.objects.count() - before, 12)
+        self.assertIn('django_faker.Game: 3 rows', output)
+        self.assertIn('django_faker.Player: 12 rows', output)
+        self.assertIn('Populated 15 rows of 2 models', output)
+
+    def testUnknownModel(self):
+
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+
+        with self.assertRaises(CommandError):
+            call_command('populate', 'django_faker.Nothing=1', stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('populate', 'django_faker.Game=many', stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('populate', 'django_faker.Game=1', threads=2, workers=2, stdout=StringIO())
+
+
+class LRUCacheTestCase(unittest.TestCase):
+
+    def testEviction(self):
+
+        cache = LRUCache(maxsize=2)
+        cache['a'] = 1
+        cache['b'] = 2
+        self.assertEqual(cache['a'], 1)
+        cache['c'] = 3
+
+        self.assertEqual(sorted(cache), ['a', 'c'])
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1, 'evictions': 1, 'size': 2, 'maxsize': 2})
+
+    def testSizeSetting(self):
+
+        cache = LRUCache()
+        with override_settings(FAKER_CACHE_SIZE=1):
+            cache['a'] = 1
+            cache['b'] = 2
+            self.assertEqual(list(cache), ['b'])
+        with override_settings(FAKER_CACHE_SIZE=None):
+            for i in range(0, 100):
+                cache[i] = i
+            self.assertEqual(len(cache), 101)
+
+    def testGetOrCreateOnce(self):
+
+        import threading
+        import time
+
+        def factory():
+            factory.count += 1
+            time.sleep(0.05)
+            return object()
+        factory.count = 0
+
+        cache = LRUCache(maxsize=2)
+        values = []
+        threads = [threading.Thread(target=lambda: values.append(cache.getOrCreate('key', factory)))
+                   for i in range(0, 8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(factory.count, 1)
+        self.assertTrue(all([value is values[0] for value in values]))
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def testGetOrCreateHits(self):
+
+        cache = LRUCache(maxsize=2)
+        self.assertEqual(cache.getOrCreate('a', lambda value: value, 1), 1)
+        cache['b'] = 2
+        self.assertEqual(cache.getOrCreate('a', None), 1)
+        cache['c'] = 3
+        self.assertEqual(sorted(cache), ['a', 'c'])
+
+        # a hit does not wait for a locked cache
+        with cache.lock:
+            self.assertEqual(cache.getOrCreate('a', None), 1)
+        self.assertEqual(cache.stats()['hits'], 2)
+
 
 class APIDjangoFakerTestCase(unittest.TestCase):
 
@@ -201,6 +1356,49 @@ class APIDjangoFakerTestCase(unittest.TestCase):
         self.assertEqual( DjangoFaker().getGenerator(locale='it_IT'), DjangoFaker().getGenerator(locale='it_IT') )
         self.assertIs( DjangoFaker().getGenerator(locale='it_IT'), DjangoFaker().getGenerator(locale='it_IT') )
 
+    def testDefaultCodenameCache(self):
+
+        codename = DjangoFaker.getDefaultCodename()
+        self.assertEqual(DjangoFaker.defaultCodename, codename)
+
+        with override_settings(FAKER_LOCALE='it_IT', FAKER_PROVIDERS=None):
+            self.assertEqual(DjangoFaker.getDefaultCodename(), 'it_IT')
+            self.assertIs(DjangoFaker.getGenerator(), DjangoFaker.getGenerator(codename='it_IT'))
+
+        self.assertEqual(DjangoFaker.getDefaultCodename(), codename)
+
+    def testLazyGenerator(self):
+
+        DjangoFaker.generators.clear()
+        generator = DjangoFaker.getGenerator(locale='it_IT')
+        self.assertFalse(generator.isBuilt)
+        self.assertTrue(generator.format('name'))
+        self.assertTrue(generator.isBuilt)
+
+        DjangoFaker.generators.clear()
+        DjangoFaker.warmUp(['it_IT'])
+        self.assertTrue(DjangoFaker.getGenerator(locale='it_IT').isBuilt)
+
+    def testLazyGeneratorResolve(self):
+
+        from faker.generator import Generator
+
+        DjangoFaker.generators.clear()
+        generator = DjangoFaker.getGenerator(locale='it_IT')
+        self.assertNotIsInstance(generator, Generator)
+        self.assertIsInstance(generator.resolve(), Generator)
+        self.assertIs(generator.resolve(), generator.resolve())
+        self.assertIs(DjangoFaker.getGenerator(locale='it_IT').resolve(), generator.resolve())
+
+    def testAppConfigWarmUp(self):
+
+        from django.apps import apps
+
+        DjangoFaker.generators.clear()
+        with override_settings(FAKER_WARMUP=['it_IT']):
+            apps.get_app_config('django_faker').ready()
+        self.assertTrue(DjangoFaker.getGenerator(locale='it_IT').isBuilt)
+
     def testFakerCachePopulator(self):
 
         self.assertEqual( DjangoFaker().getPopulator(), DjangoFaker().getPopulator() )
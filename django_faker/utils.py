@@ -0,0 +1,336 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+def deriveSeed(seed, *parts):
+    """
+    Derive a seed from a base seed and some parts (model label, field name,
+    chunk index..). The derivation is stable across processes and Python
+    versions, unlike hash().
+
+    :rtype: integer
+    """
+    key = '\x00'.join(['%s' % part for part in (seed,) + parts])
+    return int(hashlib.sha1(key.encode('utf-8')).hexdigest()[:16], 16)
+
+
+def pinTime(source, timestamp):
+    """
+    Pin the end of the random dates generated with `source`, a generator or a
+    random.Random, to `timestamp`. None unpins it, see referenceTime
+    """
+    source.pinnedTime = timestamp
+
+
+def referenceTime(source=None):
+    """
+    The end of the random dates generated with `source`: the timestamp pinned
+    by a seeded run, so the same seed generates the same dates in later runs,
+    or now
+
+    :rtype: integer
+    """
+    pinned = getattr(source, 'pinnedTime', None)
+    return int(time.time()) if pinned is None else pinned
+
+
+# marks a missing key of LRUCache.getOrCreate
+missing = object()
+
+
+class LRUCache(object):
+    """
+    Mapping of bounded size, when it is full the least recently used key is
+    evicted. Safe to use from many threads.
+
+    `maxsize` is read from the `setting` of the Django settings when not
+    given, at every insert, None means unbounded. hits, misses and evictions
+    are counted, see stats().
+    """
+
+    defaultSize = 32
+
+    def __init__(self, maxsize=None, setting='FAKER_CACHE_SIZE'):
+        """
+        :param maxsize: optional int The maximum number of keys
+        :type maxsize: integer or None
+        :param setting: str The name of the setting of the maximum number of keys
+        """
+        self._maxsize = maxsize
+        self.setting = setting
+        self.data = OrderedDict()
+        # the most recently used key
+        self.last = missing
+        self.lock = threading.RLock()
+        self.keyLocks = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def maxsize(self):
+        if self._maxsize is not None:
+            return self._maxsize
+        from django.conf import settings
+        return getattr(settings, self.setting, self.defaultSize)
+
+    def touch(self, key):
+        """
+        Mark the key as the most recently used and return its value
+        """
+        value = self.data.pop(key)
+        self.data[key] = value
+        self.last = key
+        return value
+
+    def __getitem__(self, key):
+        with self.lock:
+            if key not in self.data:
+                self.misses += 1
+                raise KeyError(key)
+            self.hits += 1
+            return self.touch(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            self.data.pop(key, None)
+            self.data[key] = value
+            self.last = key
+            maxsize = self.maxsize
+            while maxsize is not None and len(self.data) > max(maxsize, 1):
+                self.data.popitem(last=False)
+                self.evictions += 1
+
+    def __delitem__(self, key):
+        with self.lock:
+            del self.data[key]
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        with self.lock:
+            return iter(list(self.data))
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+    def getOrCreate(self, key, factory, *args):
+        """
+        The value of the key, created with factory(*args) when missing. Threads
+        asking for the same missing key wait for the first one to create it,
+        the other keys are not locked meanwhile.
+
+        A hit does not wait for the lock: the key is marked as the most
+        recently used only when no other thread holds the lock, and the hits
+        are counted without it.
+        """
+        value = self.data.get(key, missing)
+        if value is not missing:
+            self.hits += 1
+            if key != self.last and self.lock.acquire(False):
+                try:
+                    if key in self.data:
+                        self.touch(key)
+                finally:
+                    self.lock.release()
+            return value
+
+        with self.lock:
+            if key in self.data:
+                self.hits += 1
+                return self.touch(key)
+            keyLock = self.keyLocks.setdefault(key, threading.Lock())
+
+        with keyLock:
+            with self.lock:
+                if key in self.data:
+                    self.hits += 1
+                    return self.touch(key)
+                self.misses += 1
+            try:
+                value = factory(*args)
+                self[key] = value
+            finally:
+                with self.lock:
+                    self.keyLocks.pop(key, None)
+        return value
+
+    def stats(self):
+        """
+        :rtype: dict with hits, misses, evictions, size and maxsize
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self.data),
+            'maxsize': self.maxsize,
+        }
+
+
+class BloomFilter(object):
+    """
+    Compact set of hashable values, with false positives at a rate of about
+    `errorRate` up to `capacity` values but without false negatives.
+
+    The positions are derived from hash(), so a filter is valid only in the
+    process that filled it.
+    """
+
+    def __init__(self, capacity, errorRate=0.001):
+        """
+        :param capacity: int The expected number of values
+        :param errorRate: float The rate of false positives at capacity
+        """
+        self.capacity = max(int(capacity), 1)
+        self.size = int(-self.capacity * math.log(errorRate) / math.log(2) ** 2) + 1
+        self.hashes = max(int(round(self.size / float(self.capacity) * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, value):
+        # double hashing, h1 + i * h2
+        h1 = hash(value)
+        h2 = hash((value, 'BloomFilter')) | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(0, self.hashes)]
+
+    def add(self, value):
+        bits = self.bits
+        for position in self.positions(value):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        bits = self.bits
+        for position in self.positions(value):
+            if not bits[position >> 3] & 1 << (position & 7):
+                return False
+        return True
+
+    def __len__(self):
+        return self.count
+
+
+class UniqueSet(object):
+    """
+    Values already used for a unique constraint.
+
+    Up to `exactSize` values are kept in a set, then in Bloom filters that
+    double their capacity when they are full: a value added is always
+    found, a value never added is found by mistake only at the rate of
+    the filters.
+    """
+
+    exactSize = 100000
+    errorRate = 0.001
+
+    def __init__(self, capacity=None):
+        """
+        :param capacity: optional int The expected number of values, the
+            capacity of the first Bloom filter
+        """
+        self.capacity = capacity
+        self.values = set()
+        self.filters = []
+
+    def add(self, value):
+        if self.values is not None:
+            self.values.add(value)
+            if len(self.values) > self.exactSize:
+                self.compact()
+            return
+        bloom = self.filters[-1]
+        if len(bloom) >= bloom.capacity:
+            bloom = BloomFilter(bloom.capacity * 2, self.errorRate)
+            self.filters.append(bloom)
+        bloom.add(value)
+
+    def compact(self):
+        """
+        Move the values of the set in a Bloom filter
+        """
+        bloom = BloomFilter(max(self.capacity or 0, len(self.values) * 2), self.errorRate)
+        for value in self.values:
+            bloom.add(value)
+        self.filters = [bloom]
+        self.values = None
+
+    def __contains__(self, value):
+        if self.values is not None:
+            return value in self.values
+        for bloom in self.filters:
+            if value in bloom:
+                return True
+        return False
+
+    def __len__(self):
+        if self.values is not None:
+            return len(self.values)
+        return sum([len(bloom) for bloom in self.filters])
+
+
+class LazyGenerator(object):
+    """
+    Proxy of a faker generator, built by `factory` on the first use of one of
+    its formatters, see Faker.getGenerator. Any attribute is looked up on the
+    generator.
+    """
+
+    def __init__(self, factory):
+        """
+        :param factory: callable returning the generator
+        """
+        self._factory = factory
+        self._generator = None
+        self._lock = threading.Lock()
+
+    @property
+    def isBuilt(self):
+        return self._generator is not None
+
+    def resolve(self):
+        """
+        The generator, built on the first call
+
+        :rtype: Generator
+        """
+        if self._generator is None:
+            with self._lock:
+                if self._generator is None:
+                    self._generator = self._factory()
+        return self._generator
+
+    def format(self, formatter, *args, **kwargs):
+        return self.resolve().format(formatter, *args, **kwargs)
+
+    def seed(self, seed=None):
+        return self.resolve().seed(seed)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        value = getattr(self.resolve(), name)
+        if callable(value):
+            # the formatters used are found without __getattr__ the next time
+            self.__dict__[name] = value
+        return value
+
+    def __repr__(self):
+        if self._generator is None:
+            return '<LazyGenerator: not built>'
+        return '<LazyGenerator: %r>' % self._generator
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+import argparse
+import json
+import sys
+
+import django
+from django.conf import settings
+
+from runtests import configure
+
+if not settings.configured: configure()
+
+if hasattr(django, 'setup'): django.setup()
+
+from django.test.utils import get_runner
+
+
+def runbenchmarks():
+    parser = argparse.ArgumentParser(description='Run the django-faker benchmarks, the report is written as JSON.')
+    parser.add_argument('names', nargs='*', help='run only the benchmarks whose name starts with one of these')
+    parser.add_argument('--rows', type=int, default=1000, help='rows populated or rendered by each benchmark')
+    parser.add_argument('--output', help='write the report to this file instead of the standard output')
+    options = parser.parse_args()
+
+    # the benchmark models must be registered before the test database is created
+    import benchmarks
+
+    TestRunner = get_runner(settings)
+    test_runner = TestRunner(verbosity=0, interactive=False)
+    test_runner.setup_test_environment()
+    old_config = test_runner.setup_databases()
+    try:
+        report = benchmarks.run(options.names, options.rows)
+    finally:
+        test_runner.teardown_databases(old_config)
+        test_runner.teardown_test_environment()
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if options.output:
+        with open(options.output, 'w') as stream:
+            stream.write(output + '\n')
+    else:
+        sys.stdout.write(output + '\n')
+
+
+if __name__ == '__main__':
+    runbenchmarks()
@@ -1,5 +1,7 @@
 #!/usr/bin/env python
+import os
 import sys
+import tempfile
 
 from django.conf import settings
 
@@ -14,6 +16,12 @@ def configure():
             'default': {
                 'ENGINE': 'django.db.backends.sqlite3',
                 'NAME': ':memory:',
+                },
+            # a file, shared with the worker processes of the parallel tests
+            'parallel': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': os.path.join(tempfile.gettempdir(), 'django_faker_parallel.sqlite3'),
+                'TEST': {'NAME': os.path.join(tempfile.gettempdir(), 'test_django_faker_parallel.sqlite3')},
                 }
         },
         INSTALLED_APPS=(
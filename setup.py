@@ -38,6 +38,9 @@ setup(
     keywords='faker fixtures data test django',
     long_description=read_file('README.rst'),
     install_requires=['django','Faker>=0.7.3'],
+    extras_require={
+        'async': ['asgiref'],
+    },
     tests_require=['django','Faker>=0.7.3'],
     test_suite="runtests.runtests",
     zip_safe=False,